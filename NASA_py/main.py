@@ -82,11 +82,11 @@ while running:
 
     # --- ACTUALIZACIÓN ---
     player.camera.handle_input(events)
-    player.update_blocks_position()
+    player.update_blocks_position(screen.get_rect())
 
     # --- RENDER ---
     screen.fill((15, 15, 15))
-    player.layout.draw(screen)
+    player.draw(screen)
     screen.blit(player.previsualization_block.image, player.previsualization_block.rect)
 
     pygame.display.flip()
@@ -16,6 +16,16 @@ class Block(pygame.sprite.Sprite):
         x, y, z = camera.grid_to_iso(self.pos)
         self.rect.topleft = (x, y)
 
+    def set_base(self, camera):
+        """Guarda la posición isométrica sin el offset de la cámara (para culling)."""
+        x, y, z = camera.grid_to_iso(self.pos)
+        self.base_pos = (x - camera.offset.x, y - camera.offset.y)
+        self.base_rect = self.image.get_rect(topleft=self.base_pos)
+
+    def move_to(self, offset):
+        """Coloca el sprite en pantalla a partir de su posición base y el offset."""
+        self.rect.topleft = (self.base_pos[0] + offset[0], self.base_pos[1] + offset[1])
+
 
 class Previsualization_Block(Block):
     def __init__(self, img=None, alpha=50):
@@ -1,6 +1,8 @@
 import pygame
+from bisect import insort
 from src.block import *
 from src.camera import *
+from src.terrain import Terrain
 
 class Player():
     def __init__(self):
@@ -23,8 +25,22 @@ class Player():
         # (lista = pila/overlay en ese mismo z)
         self.grid = {}
 
+        # Índice por columna: columns[(i,j)] = [k, ...] ordenada ascendente.
+        # Se mantiene en add_block/remove_block para que la cima sea O(1).
+        self.columns = {}
+
         self.camera = Camera()
+
+        # Culling: sprites en orden de capa con sus rects base (sin offset),
+        # y los visibles en el último viewport. Se recalculan sólo si cambia
+        # el offset de la cámara, el viewport o el layout.
+        self._sprites = []
+        self._base_rects = []
+        self._visible = None
+        self._layout_dirty = True
+        self._last_view = None
         self.previsualization_block = Previsualization_Block()
+        self.terrain = None
 
         # Offset de capa por tipo (para ordenar visualmente en el mismo z)
         self.layer_offset = {
@@ -40,12 +56,30 @@ class Player():
     # =========================================================
     def _col_levels(self, i, j):
         """Regresa lista de k existentes en la columna (i,j)."""
-        return [k for (x, y, k) in self.grid.keys() if x == i and y == j]
+        return list(self.columns.get((i, j), ()))
 
     def _top_k(self, i, j):
         """k más alto en (i,j) o None si vacío."""
-        niveles = self._col_levels(i, j)
-        return max(niveles) if niveles else None
+        niveles = self.columns.get((i, j))
+        return niveles[-1] if niveles else None
+
+    def _add_level(self, i, j, k):
+        """Registra k en el índice de la columna (i,j)."""
+        niveles = self.columns.setdefault((i, j), [])
+        if not niveles or niveles[-1] < k:
+            niveles.append(k)
+        else:
+            insort(niveles, k)
+
+    def _remove_level(self, i, j, k):
+        """Quita k del índice de la columna (i,j)."""
+        niveles = self.columns[(i, j)]
+        if niveles[-1] == k:
+            niveles.pop()
+        else:
+            niveles.remove(k)
+        if not niveles:
+            del self.columns[(i, j)]
 
     def _cell_items(self, i, j, k):
         """Lista (pila) de items en (i,j,k)."""
@@ -130,6 +164,8 @@ class Player():
                 target_k = topk + 1
 
         # Prepara pila en la celda destino
+        if (i, j, target_k) not in self.grid:
+            self._add_level(i, j, target_k)
         pila = self.grid.setdefault((i, j, target_k), [])
 
         # Índice dentro de la pila (para orden visual dentro del mismo z)
@@ -137,11 +173,13 @@ class Player():
 
         # Crear sprite y agregar al layout con su capa
         sprite = Block((i, j, target_k), self.selected_object["img"])
+        sprite.set_base(self.camera)
         layer  = self._calc_layer(i, j, target_k, sel_tipo, idx)
         self.layout.add(sprite, layer=layer)
 
         # Registrar en grid
         pila.append({"type": sel_tipo, "sprite": sprite})
+        self._layout_dirty = True
 
         # Actualizar previsualización a donde quedó realmente
         self.previsualization_block.update_position_block((i, j, target_k), self.camera)
@@ -156,7 +194,8 @@ class Player():
         pila = self._cell_items(i, j, topk)
         if not pila:
             # Inconsistencia defensiva: no debería pasar
-            del self.grid[(i, j, topk)]
+            self.grid.pop((i, j, topk), None)
+            self._remove_level(i, j, topk)
             return
 
         # Sacar el último (overlay primero). Esto respeta tu expectativa de delete.
@@ -164,23 +203,53 @@ class Player():
         sprite = item.get("sprite")
         if sprite:
             sprite.kill()
+            self._layout_dirty = True
 
         # Si la pila quedó vacía, borra la celda
         if not pila:
             del self.grid[(i, j, topk)]
+            self._remove_level(i, j, topk)
 
     # =========================================================
     # Terreno y actualización
     # =========================================================
-    def generate_terrain(self, terrain):
-        """Terreno puramente visual (no entra al grid)."""
-        for i in range(5, 30):
-            for j in range(-5, 20):
-                # z=0 visual, pero capa MUY baja para no tapar nada
-                sprite = Block((i, j, 0), terrain)
-                layer  = i + j + self.layer_offset["ground"]
-                self.layout.add(sprite, layer=layer)
-
-    def update_blocks_position(self):
-        """Actualiza todos los sprites con la cámara."""
-        self.layout.update(self.camera)
+    def generate_terrain(self, terrain, i_range=range(5, 30), j_range=range(-5, 20)):
+        """Terreno puramente visual (no entra al grid ni al layout):
+           se pre-renderiza por chunks y se dibuja antes que los bloques."""
+        self.terrain = Terrain(terrain, i_range, j_range, self.camera)
+
+    def update_blocks_position(self, viewport=None):
+        """Actualiza los sprites con la cámara.
+           Con viewport (Rect de pantalla) sólo se reposicionan los sprites
+           visibles, y sólo cuando cambia el offset de la cámara o el layout."""
+        if viewport is None:
+            self.layout.update(self.camera)
+            self._visible = None
+            return
+
+        if self._layout_dirty:
+            self._sprites = self.layout.sprites()   # ya en orden de capa
+            self._base_rects = [s.base_rect for s in self._sprites]
+            self._layout_dirty = False
+            self._last_view = None
+
+        offset = (self.camera.offset.x, self.camera.offset.y)
+        view = (offset, tuple(viewport))
+        if view == self._last_view:
+            return
+        self._last_view = view
+
+        # Viewport en coordenadas base: una sola prueba de colisión en C
+        base_view = pygame.Rect(viewport).move(-offset[0], -offset[1])
+        self._visible = [self._sprites[n] for n in base_view.collidelistall(self._base_rects)]
+        for sprite in self._visible:
+            sprite.move_to(offset)
+
+    def draw(self, surface):
+        """Dibuja el terreno y el layout (sólo los sprites visibles si hay culling)."""
+        if self.terrain:
+            self.terrain.draw(surface)
+        if self._visible is None:
+            self.layout.draw(surface)
+        else:
+            surface.blits([(s.image, s.rect) for s in self._visible], doreturn=False)
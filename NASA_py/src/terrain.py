@@ -0,0 +1,71 @@
+import pygame
+from collections import OrderedDict
+
+class Terrain():
+    """Terreno puramente visual, pre-renderizado por chunks.
+
+       El área se divide en chunks de chunk_size x chunk_size tiles. Cada chunk
+       se dibuja una sola vez en su propia Surface (la primera vez que entra al
+       viewport) y se guarda en una caché LRU; por frame sólo se blitean los
+       chunks visibles, sin importar cuántos tiles tenga el terreno."""
+
+    def __init__(self, img, i_range, j_range, camera, chunk_size=16, max_cached=64):
+        self.img = img
+        self.camera = camera
+        self.chunk_size = chunk_size
+        self.max_cached = max_cached
+        self._cache = OrderedDict()   # n -> Surface del chunk
+
+        # Geometría base (sin offset de cámara) de cada chunk: rangos de tiles
+        # y rect envolvente, en orden de dibujo (ci + cj, luego ci).
+        self._chunks = []
+        for ci, i0 in enumerate(range(i_range.start, i_range.stop, chunk_size)):
+            for cj, j0 in enumerate(range(j_range.start, j_range.stop, chunk_size)):
+                ii = range(i0, min(i0 + chunk_size, i_range.stop))
+                jj = range(j0, min(j0 + chunk_size, j_range.stop))
+                self._chunks.append((ci + cj, ci, ii, jj))
+        self._chunks.sort(key=lambda c: (c[0], c[1]))
+        self._chunks = [(ii, jj) for _, _, ii, jj in self._chunks]
+
+        # Las esquinas del rombo (i,j) bastan para el rect envolvente
+        self._rects = []
+        for ii, jj in self._chunks:
+            esquinas = [(ii[0], jj[0]), (ii[0], jj[-1]), (ii[-1], jj[0]), (ii[-1], jj[-1])]
+            rects = [self.img.get_rect(topleft=self._base_pos(i, j)) for i, j in esquinas]
+            self._rects.append(rects[0].unionall(rects[1:]))
+
+    def _base_pos(self, i, j):
+        """Posición isométrica del tile (i,j,0) sin el offset de la cámara."""
+        x, y, z = self.camera.grid_to_iso((i, j, 0))
+        return (x - self.camera.offset.x, y - self.camera.offset.y)
+
+    def _chunk_surface(self, n):
+        """Surface del chunk n (la dibuja si no está en caché)."""
+        surf = self._cache.get(n)
+        if surf is not None:
+            self._cache.move_to_end(n)
+            return surf
+
+        ii, jj = self._chunks[n]
+        rect = self._rects[n]
+        # Mismo orden que las capas de sprites: i+j, luego i
+        tiles = sorted(((i, j) for i in ii for j in jj), key=lambda t: (t[0] + t[1], t[0]))
+        surf = pygame.Surface(rect.size, pygame.SRCALPHA).convert_alpha()
+        blits = []
+        for i, j in tiles:
+            x, y = self._base_pos(i, j)
+            blits.append((self.img, (x - rect.x, y - rect.y)))
+        surf.blits(blits, doreturn=False)
+
+        self._cache[n] = surf
+        if len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return surf
+
+    def draw(self, surface, viewport=None):
+        """Dibuja los chunks que intersectan el viewport (por defecto, la pantalla)."""
+        ox, oy = self.camera.offset.x, self.camera.offset.y
+        view = pygame.Rect(viewport or surface.get_rect()).move(-ox, -oy)
+        visibles = view.collidelistall(self._rects)
+        surface.blits([(self._chunk_surface(n), (self._rects[n].x + ox, self._rects[n].y + oy))
+                       for n in visibles], doreturn=False)
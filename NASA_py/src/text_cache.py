@@ -0,0 +1,26 @@
+from collections import OrderedDict
+
+# Rendered text surfaces keyed by (font, text, color, antialias), least
+# recently used first. Labels and dropdown options repeat every frame, so
+# after the first frame drawing them is a dict lookup plus a blit.
+MAX_CACHED_SURFACES = 512
+
+_cache = OrderedDict()
+
+
+def render_text(font, text, color, antialias=True):
+    """Cached equivalent of font.render(text, antialias, color).
+
+    The returned surface is shared between callers and must not be modified.
+    """
+    key = (font, text, tuple(color), antialias)
+    surface = _cache.get(key)
+    if surface is not None:
+        _cache.move_to_end(key)
+        return surface
+
+    surface = font.render(text, antialias, color)
+    _cache[key] = surface
+    if len(_cache) > MAX_CACHED_SURFACES:
+        _cache.popitem(last=False)
+    return surface
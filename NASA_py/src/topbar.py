@@ -1,4 +1,5 @@
 import pygame
+from src.text_cache import render_text
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -20,7 +21,7 @@ class TopBarLabel:
 
     def draw(self, surface):
         pygame.draw.rect(surface, DARK_GRAY, self.rect)
-        text_surf = font.render(self.text, True, WHITE)
+        text_surf = render_text(font, self.text, WHITE)
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
 
@@ -48,7 +49,7 @@ class TopBarButton:
             display_text += f": {self.selected_option}"
         elif self.selected_option and not self.cycle:
             display_text += f": {self.selected_option}"
-        text_surf = font.render(display_text, True, BLACK)
+        text_surf = render_text(font, display_text, BLACK)
         surface.blit(text_surf, (self.rect.x + 10, self.rect.y + 5))
 
         if self.dropdown_visible and not self.cycle:
@@ -64,7 +65,7 @@ class TopBarButton:
                 rect = pygame.Rect(x, y + i * option_height, width, option_height)
                 self.dropdown_rects.append(rect)
                 pygame.draw.rect(surface, LIGHT_GRAY, rect)
-                option_text = font.render(self.options[idx], True, BLACK)
+                option_text = render_text(font, self.options[idx], BLACK)
                 surface.blit(option_text, (rect.x + 5, rect.y + 5))
 
             needs_scroll = len(self.options) > self.max_visible
@@ -72,7 +73,7 @@ class TopBarButton:
                 self.scroll_up_rect.x = x
                 self.scroll_up_rect.y = y - SCROLL_BTN_HEIGHT
                 pygame.draw.rect(surface, DARK_GRAY if self.scroll_index > 0 else GRAY, self.scroll_up_rect)
-                up_text = font.render('▲', True, BLACK)
+                up_text = render_text(font, '▲', BLACK)
                 surface.blit(up_text, (self.scroll_up_rect.x + width // 2 - up_text.get_width() // 2,
                                        self.scroll_up_rect.y + 2))
 
@@ -80,7 +81,7 @@ class TopBarButton:
                 self.scroll_down_rect.y = y + visible_count * option_height
                 pygame.draw.rect(surface, DARK_GRAY if self.scroll_index + visible_count < len(self.options) else GRAY,
                                  self.scroll_down_rect)
-                down_text = font.render('▼', True, BLACK)
+                down_text = render_text(font, '▼', BLACK)
                 surface.blit(down_text, (self.scroll_down_rect.x + width // 2 - down_text.get_width() // 2,
                                          self.scroll_down_rect.y + 2))
 
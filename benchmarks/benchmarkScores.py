@@ -0,0 +1,147 @@
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import subprocess
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import numpy as np
+import funcionJSON
+from labeler.JSONdatasetGenerator import MODULE_TYPES, generate_props
+
+# Benchmark de las funciones de scoring de funcionJSON.
+#
+# Genera layouts con una cantidad de celdas y un tamaño de grid controlados
+# (mismas reglas de módulos/props que JSONdatasetGenerator), mide cada
+# calcular* por separado y generarScoresHabitat completo, y guarda los
+# resultados en JSON junto con el commit para comparar entre versiones:
+#
+#   python benchmarks/benchmarkScores.py --celdas 20 100 500 --grids 50 100
+#   python benchmarks/benchmarkScores.py --comparar benchmarks/resultados/<commit>.json
+
+CELDAS_POR_DEFECTO = [20, 100, 500]
+GRIDS_POR_DEFECTO = [50, 100]
+CONTEXTO = {"cantidadTripulacion": 4, "materialEstructural": "COMPUESTO", "resistenciaRadiacion": 7}
+
+
+# --- 1. LAYOUTS ---
+
+def generarLayoutBenchmark(numCeldas, grid, rng):
+    """
+    Layout de `numCeldas` celdas en un grid de grid x grid: un PRIVATE por
+    tripulante y uno de cada otro módulo (como el generador), y el resto con
+    tipos al azar.
+    """
+    tripulacion = CONTEXTO['cantidadTripulacion']
+    tipos = ['PRIVATE'] * tripulacion + [t for t in MODULE_TYPES if t != 'PRIVATE']
+    tipos += [rng.choice(MODULE_TYPES) for _ in range(max(0, numCeldas - len(tipos)))]
+    celdas = [{"x": rng.randrange(grid), "y": rng.randrange(grid), "type": tipo, "props": generate_props(tipo, rng)}
+              for tipo in tipos[:numCeldas]]
+    return {'id': f'benchmark_{numCeldas}_{grid}', 'cells': celdas}
+
+
+# --- 2. FUNCIONES A MEDIR ---
+
+def _funcionesAMedir(config):
+    """(nombre, funcion(layout)) para cada sub-score y para el scoring completo."""
+    tripulacion = CONTEXTO['cantidadTripulacion']
+    f = funcionJSON
+    return [
+        ('calcularScoreChecklist', lambda l: f.calcularScoreChecklist(l['cells'], tripulacion)),
+        ('calcularScoresIngenieria', lambda l: f.calcularScoresIngenieria(l['cells'], tripulacion, config)),
+        ('calcularScoresLayout', lambda l: f.calcularScoresLayout(l['cells'], config)),
+        ('calcularScoresTecnologicos', lambda l: f.calcularScoresTecnologicos(l['cells'])),
+        ('calcularScoreVistaEspacial[exacto]', lambda l: f.calcularScoreVistaEspacial(l['cells'], 'exacto', config)),
+        ('calcularScoreVistaEspacial[muestreado]',
+         lambda l: f.calcularScoreVistaEspacial(l['cells'], 'muestreado', config)),
+        ('calcularScoreAreaDeTrabajo', lambda l: f.calcularScoreAreaDeTrabajo(l['cells'])),
+        ('calcularScoreErgonomia', lambda l: f.calcularScoreErgonomia(l['cells'], config)),
+        ('generarScoresHabitat[python]', lambda l: f.generarScoresHabitat(l, CONTEXTO, config=config)),
+        ('generarScoresHabitat[numpy]', lambda l: f.generarScoresHabitat(l, CONTEXTO, motor='numpy', config=config)),
+    ]
+
+def medir(funcion, layouts, repeticiones):
+    """Mejor tiempo promedio por llamada (s) sobre `repeticiones` pasadas por todos los layouts."""
+    funcion(layouts[0])  # calentamiento (cachés de rayos, etc.)
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for layout in layouts:
+            funcion(layout)
+        mejor = min(mejor, (time.perf_counter() - inicio) / len(layouts))
+    return mejor
+
+
+# --- 3. EJECUCIÓN ---
+
+def _commitActual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def ejecutarBenchmark(celdas=CELDAS_POR_DEFECTO, grids=GRIDS_POR_DEFECTO, numLayouts=10, repeticiones=3, semilla=0):
+    """Corre todas las combinaciones (celdas, grid) y regresa el dict de resultados."""
+    resultados = []
+    for grid in grids:
+        config = funcionJSON.ConfiguracionScoring(grid, grid)
+        for numCeldas in celdas:
+            rng = random.Random(f"{semilla}-{numCeldas}-{grid}")
+            layouts = [generarLayoutBenchmark(numCeldas, grid, rng) for _ in range(numLayouts)]
+            for nombre, funcion in _funcionesAMedir(config):
+                segundos = medir(funcion, layouts, repeticiones)
+                resultados.append({'funcion': nombre, 'celdas': numCeldas, 'grid': grid,
+                                   'segundosPorLlamada': segundos})
+                print(f"{nombre:<40} celdas={numCeldas:<6} grid={grid:<5} {segundos * 1000:10.3f} ms")
+
+    return {
+        'commit': _commitActual(),
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'parametros': {'celdas': list(celdas), 'grids': list(grids), 'layouts': numLayouts,
+                       'repeticiones': repeticiones, 'semilla': semilla},
+        'resultados': resultados,
+    }
+
+def compararResultados(actual, anterior):
+    """Imprime la razón de tiempos actual/anterior para las mediciones en común."""
+    previos = {(r['funcion'], r['celdas'], r['grid']): r['segundosPorLlamada'] for r in anterior['resultados']}
+    print(f"\nComparación contra {anterior.get('commit')} (actual / anterior):")
+    for r in actual['resultados']:
+        clave = (r['funcion'], r['celdas'], r['grid'])
+        if clave in previos and previos[clave] > 0:
+            print(f"{r['funcion']:<40} celdas={r['celdas']:<6} grid={r['grid']:<5} "
+                  f"{r['segundosPorLlamada'] / previos[clave]:8.2f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark de las funciones de scoring.")
+    parser.add_argument('--celdas', type=int, nargs='+', default=CELDAS_POR_DEFECTO, help="Cantidades de celdas")
+    parser.add_argument('--grids', type=int, nargs='+', default=GRIDS_POR_DEFECTO, help="Lados del grid")
+    parser.add_argument('--layouts', type=int, default=10, help="Layouts distintos por combinación")
+    parser.add_argument('--repeticiones', type=int, default=3, help="Repeticiones (se toma la mejor)")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--salida', default=None,
+                        help="Archivo JSON de resultados (por defecto benchmarks/resultados/<commit>.json)")
+    parser.add_argument('--comparar', default=None, help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+
+    resultado = ejecutarBenchmark(args.celdas, args.grids, args.layouts, args.repeticiones, args.semilla)
+
+    salida = Path(args.salida or RAIZ / 'benchmarks' / 'resultados' / f"{resultado['commit'] or 'sin_commit'}.json")
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    with salida.open('w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2)
+    print(f"\nResultados guardados en '{salida}'")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            compararResultados(resultado, json.load(f))
@@ -1,6 +1,13 @@
 import math
 import pandas as pd
+import numpy as np
 import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 
 # --- 1. CONFIGURACIÓN GLOBAL ---
 
@@ -11,6 +18,50 @@ HABITAT_WIDTH_M = 50
 HABITAT_HEIGHT_M = 50
 
 
+class ConfiguracionScoring:
+    """
+    Parámetros del scoring: dimensiones del grid, pesos de la calificación
+    final y frecuencias de uso por módulo. Las constantes derivadas (área,
+    diagonal, centro, tabla de frecuencias por código) se calculan una sola
+    vez aquí en lugar de en cada llamada.
+
+    Todas las funciones de scoring aceptan `config`; si no se pasa, se usa
+    una configuración con los globales del módulo (HABITAT_WIDTH_M,
+    HABITAT_HEIGHT_M, PONDERACIONES y FRECUENCIA_USO).
+    """
+
+    def __init__(self, ancho=None, alto=None, ponderaciones=None, frecuenciaUso=None):
+        self.ancho = HABITAT_WIDTH_M if ancho is None else ancho
+        self.alto = HABITAT_HEIGHT_M if alto is None else alto
+        self.ponderaciones = PONDERACIONES if ponderaciones is None else ponderaciones
+        self.frecuenciaUso = FRECUENCIA_USO if frecuenciaUso is None else frecuenciaUso
+
+        self.area = self.ancho * self.alto
+        self.diagonal = math.sqrt(self.ancho**2 + self.alto**2)
+        self.centro = (self.ancho / 2, self.alto / 2)
+        self._frecuenciasPorCodigo = np.zeros(0, dtype=np.int64)
+
+    def frecuenciasPorCodigo(self):
+        """Frecuencia de uso indexada por código de tipo (se extiende al internar tipos nuevos)."""
+        if len(self._frecuenciasPorCodigo) != len(TIPOS_MODULO):
+            self._frecuenciasPorCodigo = np.array([self.frecuenciaUso.get(tipo, 1) for tipo in TIPOS_MODULO],
+                                                  dtype=np.int64)
+        return self._frecuenciasPorCodigo
+
+    def __repr__(self):
+        return f"ConfiguracionScoring(ancho={self.ancho}, alto={self.alto})"
+
+_configsPorDefecto = {}
+
+def _configPorDefecto():
+    """Configuración con los globales del módulo (una por cada par de dimensiones)."""
+    clave = (HABITAT_WIDTH_M, HABITAT_HEIGHT_M)
+    config = _configsPorDefecto.get(clave)
+    if config is None:
+        config = _configsPorDefecto[clave] = ConfiguracionScoring()
+    return config
+
+
 # --- 2. FUNCIONES DE CÁLCULO DE SCORES ---
 
 def _normalize(value, minVal, maxVal):
@@ -41,44 +92,98 @@ CHECKLIST_DICT = {
 }
 
 
+MAPA_TIPO_A_COLUMNA = {
+    'EXERCISE': 'hay_modulos_ejercicio',
+    'SOCIAL': 'hay_modulos_social_recreacion',
+    'FOOD': 'hay_modulos_alimentos',
+    'HYGIENE': 'hay_modulos_higiene',
+    'MEDICAL': 'hay_modulos_medicos',
+    'PRIVATE': 'hay_modulos_habitacion_privada',
+    'MAINTENANCE': 'hay_modulos_mantenimiento',
+    'MISSION PLANNING': 'hay_modulos_planeacion_de_misiones',
+    'WASTE': 'hay_modulos_gestion_residuos',
+    'LOGISTICS': 'hay_modulos_logistica',
+    'SCIENCE': 'hay_modulos_laboratorio',
+    'AIRLOCK': 'hay_modulos_airlock'
+}
+
+# Checklist compilado: el bit i de una máscara indica que hay al menos un módulo
+# de la columna COLUMNAS_CHECKLIST[i]. TABLA_CHECKLIST tiene una entrada por
+# cada una de las 4096 máscaras posibles (0.0 para las combinaciones que no
+# están en CHECKLIST_DICT), así que calificar una combinación es indexar.
+BIT_TIPO_CHECKLIST = {tipo: 1 << COLUMNAS_CHECKLIST.index(columna) for tipo, columna in MAPA_TIPO_A_COLUMNA.items()}
+
+def _compilarTablaChecklist():
+    tabla = [0.0] * (1 << len(COLUMNAS_CHECKLIST))
+    for clave, valor in CHECKLIST_DICT.items():
+        tabla[sum(bit << i for i, bit in enumerate(clave))] = valor
+    return tabla
+
+TABLA_CHECKLIST = _compilarTablaChecklist()
+TABLA_CHECKLIST_NP = np.array(TABLA_CHECKLIST, dtype=np.float64)
+
+def _mascaraChecklist(tipos):
+    """Máscara de 12 bits con las columnas del checklist cubiertas por `tipos`."""
+    mascara = 0
+    for tipo in tipos:
+        mascara |= BIT_TIPO_CHECKLIST.get(tipo, 0)
+    return mascara
+
+PARES_DESEADOS = [('FOOD', 'SOCIAL'), ('AIRLOCK', 'MAINTENANCE'), ('SCIENCE', 'AIRLOCK'), ('PRIVATE', 'SCIENCE'), ('PRIVATE', 'MEDICINE'), ('PRIVATE', 'FOOD')]
+MODULOS_RUIDOSOS = ['SOCIAL', 'EXERCISE']
+MODULOS_DE_TRABAJO = ['FOOD', 'MAINTENANCE', 'SCIENCE', 'MEDICAL']
+
+# Frecuencia de uso estimada (1-10)
+FRECUENCIA_USO = {
+    'PRIVATE': 10, 'FOOD': 9, 'SOCIAL': 8, 'HYGIENE': 8,
+    'WASTE': 7, 'EXERCISE': 7, 'MEDICAL': 5, 'MAINTENANCE': 4,
+    'SCIENCE': 6, 'LOGISTICS': 3, 'AIRLOCK': 5, 'MISSION PLANNING': 7
+}
+
+
+# Las celdas pueden traer una huella opcional de varios tiles: 'w' y 'h' (por
+# defecto 1) y 'rot' en grados (0, 90, 180 o 270; con 90 y 270 se intercambian
+# 'w' y 'h'). (x, y) es siempre el tile superior izquierdo de la huella ya
+# rotada, como el (gx, gy) de los bloques del editor.
+
+def dimensionesHuella(celda):
+    """(ancho, alto) en tiles de la huella de la celda, ya rotada."""
+    w, h = celda.get('w', 1), celda.get('h', 1)
+    if celda.get('rot', 0) % 180 == 90:
+        w, h = h, w
+    return w, h
+
+def _centroCelda(celda):
+    """Centro de la huella; para una celda 1x1 es su propio (x, y)."""
+    w, h = dimensionesHuella(celda)
+    return celda['x'] + (w - 1) / 2, celda['y'] + (h - 1) / 2
+
+def _tilesOcupados(celdas):
+    """Conjunto de tiles cubiertos por las huellas de las celdas."""
+    ocupados = set()
+    for c in celdas:
+        w, h = dimensionesHuella(c)
+        ocupados.update((c['x'] + dx, c['y'] + dy) for dx in range(w) for dy in range(h))
+    return ocupados
+
+
 def calcularScoreChecklist(celdas, cantidadTripulacion):
     """
     Calcula el score base verificando la combinación de módulos presentes
-    contra el diccionario de checklist interno.
-    """
-    mapa_tipo_a_columna = {
-        'EXERCISE': 'hay_modulos_ejercicio',
-        'SOCIAL': 'hay_modulos_social_recreacion',
-        'FOOD': 'hay_modulos_alimentos',
-        'HYGIENE': 'hay_modulos_higiene',
-        'MEDICAL': 'hay_modulos_medicos',
-        'PRIVATE': 'hay_modulos_habitacion_privada',
-        'MAINTENANCE': 'hay_modulos_mantenimiento',
-        'MISSION PLANNING': 'hay_modulos_planeacion_de_misiones',
-        'WASTE': 'hay_modulos_gestion_residuos',
-        'LOGISTICS': 'hay_modulos_logistica',
-        'SCIENCE': 'hay_modulos_laboratorio',
-        'AIRLOCK': 'hay_modulos_airlock'
-    }
-
-    presencia = {col: 0 for col in COLUMNAS_CHECKLIST}
-    tipos_presentes = {c['type'] for c in celdas}
-
-    for tipo, columna in mapa_tipo_a_columna.items():
-        if tipo in tipos_presentes:
-            presencia[columna] = 1
-        
-    numCamarotes = len([c for c in celdas if c['type'] == 'PRIVATE'])
-    if numCamarotes < cantidadTripulacion:
+    contra el diccionario de checklist interno (compilado en TABLA_CHECKLIST).
+    """
+    # Una sola pasada sobre las celdas; el conteo y los tipos presentes se
+    # sacan de la lista de tipos (list.count y set corren en C)
+    tipos = [c['type'] for c in celdas]
+    if tipos.count('PRIVATE') < cantidadTripulacion:
         return 0.0 # Penalización máxima si no hay camas para todos
-            
-    clave_actual = tuple(presencia[col] for col in COLUMNAS_CHECKLIST)
-    
-    # Busca la clave en el diccionario. Si no la encuentra, devuelve 0.0.
-    return CHECKLIST_DICT.get(clave_actual, 0.0)
 
-def calcularScoresIngenieria(celdas, cantidadTripulacion):
+    # Las combinaciones que no están en CHECKLIST_DICT valen 0.0
+    return TABLA_CHECKLIST[_mascaraChecklist(set(tipos))]
+
+def calcularScoresIngenieria(celdas, cantidadTripulacion, config=None):
     """Calcula scores de Masa, Volumen."""
+    config = config or _configPorDefecto()
     if not celdas:
         return {"scoreMasa": 0, "scoreVolumen": 0, "scoreVolumenPorPersona": 0}
 
@@ -89,13 +194,12 @@ def calcularScoresIngenieria(celdas, cantidadTripulacion):
     
 
     # Más volumen habitable es mejor, con rendimientos decrecientes
-    areaTotal = HABITAT_WIDTH_M * HABITAT_HEIGHT_M
-    volumenHabitable = areaTotal - len(celdas) # Asumiendo 1 tile = 1 unidad de área
+    areaTotal = config.area
+    areaOcupada = sum(w * h for w, h in map(dimensionesHuella, celdas)) # Asumiendo 1 tile = 1 unidad de área
+    volumenHabitable = areaTotal - areaOcupada
     scoreVolumenLog = math.log10(1 + max(0, volumenHabitable))
     scoreVolumen = _normalize(scoreVolumenLog, 2, 4) # log(100) a log(10000)
     
-    areaTotal = HABITAT_WIDTH_M * HABITAT_HEIGHT_M
-    volumenHabitable = areaTotal - len(celdas)
     volumenPorPersona = volumenHabitable / cantidadTripulacion if cantidadTripulacion > 0 else 0
     
     # Usamos los valores de los papers: el óptimo está alrededor de 37 m³/persona
@@ -104,22 +208,25 @@ def calcularScoresIngenieria(celdas, cantidadTripulacion):
     
     return {"scoreMasa": scoreMasa, "scoreVolumen": scoreVolumen, "scoreVolumenPorPersona": scoreVolumenPorPersona}
 
-def calcularScoresLayout(celdas):
+def calcularScoresLayout(celdas, config=None):
     """Calcula scores espaciales: Zonificación, Adyacencias y Privacidad."""
+    config = config or _configPorDefecto()
+    # Las distancias se miden entre los centros de las huellas
+    centros = [_centroCelda(c) for c in celdas]
+
     # --- Zonificación (Limpio vs. Sucio) ---
-    puntosLimpios = [(c['x'], c['y']) for c in celdas if c['props']['limpieza'] == 1.0]
-    puntosSucios = [(c['x'], c['y']) for c in celdas if c['props']['limpieza'] == 0.0]
+    puntosLimpios = [p for c, p in zip(celdas, centros) if c['props']['limpieza'] == 1.0]
+    puntosSucios = [p for c, p in zip(celdas, centros) if c['props']['limpieza'] == 0.0]
     scoreZonificacion = 0.5
     if puntosLimpios and puntosSucios:
         cxL, cyL = [sum(coords) / len(puntosLimpios) for coords in zip(*puntosLimpios)]
         cxS, cyS = [sum(coords) / len(puntosSucios) for coords in zip(*puntosSucios)]
         distancia = math.sqrt((cxL - cxS)**2 + (cyL - cyS)**2)
-        maxDist = math.sqrt(HABITAT_WIDTH_M**2 + HABITAT_HEIGHT_M**2)
+        maxDist = config.diagonal
         scoreZonificacion = _normalize(distancia, 0, maxDist * 0.75)
 
     # --- Adyacencias Deseadas ---
-    PARES_DESEADOS = [('FOOD', 'SOCIAL'), ('AIRLOCK', 'MAINTENANCE'), ('SCIENCE', 'AIRLOCK'), ('PRIVATE', 'SCIENCE'), ('PRIVATE', 'MEDICINE'), ('PRIVATE', 'FOOD')]
-    posiciones = {c['type']: (c['x'], c['y']) for c in celdas}
+    posiciones = {c['type']: p for c, p in zip(celdas, centros)}
     scoresPares = []
     for modA, modB in PARES_DESEADOS:
         if modA in posiciones and modB in posiciones:
@@ -128,12 +235,12 @@ def calcularScoresLayout(celdas):
     scoreAdyacencias = sum(scoresPares) / len(scoresPares) if scoresPares else 0
 
     # --- Privacidad ---
-    privados = [c for c in celdas if c['type'] == 'PRIVATE']
-    ruidosos = [c for c in celdas if c['type'] in ['SOCIAL', 'EXERCISE']]
+    privados = [p for c, p in zip(celdas, centros) if c['type'] == 'PRIVATE']
+    ruidosos = [p for c, p in zip(celdas, centros) if c['type'] in MODULOS_RUIDOSOS]
     scorePrivacidad = 0.5
     if privados and ruidosos:
-        distPromedio = sum(math.sqrt((p['x']-r['x'])**2 + (p['y']-r['y'])**2) for p in privados for r in ruidosos) / (len(privados)*len(ruidosos))
-        maxDist = math.sqrt(HABITAT_WIDTH_M**2 + HABITAT_HEIGHT_M**2)
+        distPromedio = sum(math.sqrt((p[0]-r[0])**2 + (p[1]-r[1])**2) for p in privados for r in ruidosos) / (len(privados)*len(ruidosos))
+        maxDist = config.diagonal
         scorePrivacidad = _normalize(distPromedio, 0, maxDist * 0.5)
         
     return {
@@ -159,18 +266,87 @@ def calcularScoresTecnologicos(celdas):
     }
 
 
-def calcularScoreVistaEspacial(celdas):
+MODOS_VISTA = ('exacto', 'muestreado')
+
+
+def _corridasLibres(libre):
+    """
+    Transformadas de distancia direccionales sobre un grid de ocupación.
+
+    `libre` es un arreglo booleano (..., ancho, alto). Para cada tile cuenta los
+    tiles libres consecutivos en las 8 direcciones (sin contar el propio tile) y
+    regresa (ejes, diagonales): la suma de las 4 corridas axiales y la de las 4
+    diagonales. Cada dirección es un barrido O(ancho * alto).
+    """
+    def haciaX(l):
+        corrida = np.zeros(l.shape, dtype=np.int32)
+        for i in range(l.shape[-2] - 2, -1, -1):
+            corrida[..., i, :] = np.where(l[..., i + 1, :], corrida[..., i + 1, :] + 1, 0)
+        return corrida
+
+    def haciaXY(l):
+        corrida = np.zeros(l.shape, dtype=np.int32)
+        for i in range(l.shape[-2] - 2, -1, -1):
+            corrida[..., i, :-1] = np.where(l[..., i + 1, 1:], corrida[..., i + 1, 1:] + 1, 0)
+        return corrida
+
+    def invX(a): return a[..., ::-1, :]
+    def invY(a): return a[..., :, ::-1]
+    def trans(a): return np.swapaxes(a, -1, -2)
+
+    ejes = haciaX(libre)
+    ejes += invX(haciaX(invX(libre)))
+    ejes += trans(haciaX(trans(libre)))
+    ejes += trans(invX(haciaX(invX(trans(libre)))))
+
+    diagonales = haciaXY(libre)
+    diagonales += invX(invY(haciaXY(invX(invY(libre)))))
+    diagonales += invY(haciaXY(invY(libre)))
+    diagonales += invX(haciaXY(invX(libre)))
+    return ejes, diagonales
+
+
+def _maxVistaExacta(libre):
+    """
+    Máximo, sobre todos los tiles libres, del promedio de las 8 líneas de visión
+    (en metros: las diagonales pesan sqrt(2)). Acepta un grid o un lote de grids.
+    """
+    ejes, diagonales = _corridasLibres(libre)
+    vistaPromedio = (ejes + math.sqrt(2) * diagonales) / 8
+    vistaPromedio[~libre] = 0
+    return vistaPromedio.max(axis=(-2, -1))
+
+
+def calcularScoreVistaEspacial(celdas, modo='exacto', config=None):
     """
     Calcula la "amplitud" del hábitat midiendo la línea de visión más larga.
     Concepto: Recompensa los espacios abiertos y penaliza los laberintos.
     Fuente: automatedEvaluation.pdf
+
+    modo='exacto' evalúa las 8 direcciones desde todos los tiles libres;
+    modo='muestreado' es el raycaster original (1 de cada 25 tiles), que se
+    conserva para pruebas de paridad.
     """
-    ocupados = {(c['x'], c['y']) for c in celdas}
+    config = config or _configPorDefecto()
+    ancho, alto = config.ancho, config.alto
+    maxDistPosible = config.diagonal
+    if modo == 'exacto':
+        libre = np.ones((ancho, alto), dtype=bool)
+        for c in celdas:
+            # Rasteriza la huella recortada al grid (un slice por celda)
+            w, h = dimensionesHuella(c)
+            x, y = math.floor(c['x']), math.floor(c['y'])
+            libre[max(x, 0):max(x + w, 0), max(y, 0):max(y + h, 0)] = False
+        return {"scoreVistaEspacial": _normalize(_maxVistaExacta(libre).item(), 0, maxDistPosible / 2)}
+    if modo != 'muestreado':
+        raise ValueError(f"Modo de vista desconocido: {modo!r} (opciones: {', '.join(MODOS_VISTA)})")
+
+    ocupados = _tilesOcupados(celdas)
     maxVistaScore = 0
     
     # Iteramos sobre una muestra de puntos para no tardar demasiado en el hackathon
-    for i in range(0, HABITAT_WIDTH_M, 5):
-        for j in range(0, HABITAT_HEIGHT_M, 5):
+    for i in range(0, ancho, 5):
+        for j in range(0, alto, 5):
             if (i, j) in ocupados:
                 continue
 
@@ -181,10 +357,10 @@ def calcularScoreVistaEspacial(celdas):
                 dx, dy = math.cos(rad), math.sin(rad)
                 distancia = 0
                 # El paso del rayo es de 1 metro (asumiendo tiles de 1m)
-                for paso in range(1, int(HABITAT_WIDTH_M * 1.5)):
+                for paso in range(1, int(ancho * 1.5)):
                     puntoActual = (int(i + dx * paso), int(j + dy * paso))
                     if puntoActual in ocupados or \
-                       not (0 <= puntoActual[0] < HABITAT_WIDTH_M and 0 <= puntoActual[1] < HABITAT_HEIGHT_M):
+                       not (0 <= puntoActual[0] < ancho and 0 <= puntoActual[1] < alto):
                         break
                     distancia = paso
                 longitudesDeRayos.append(distancia)
@@ -193,7 +369,6 @@ def calcularScoreVistaEspacial(celdas):
             if vistaPromedioTile > maxVistaScore:
                 maxVistaScore = vistaPromedioTile
 
-    maxDistPosible = math.sqrt(HABITAT_WIDTH_M**2 + HABITAT_HEIGHT_M**2)
     scoreVistaEspacial = _normalize(maxVistaScore, 0, maxDistPosible / 2) # Normaliza contra la mitad de la diagonal
     
     return {"scoreVistaEspacial": scoreVistaEspacial}
@@ -205,8 +380,7 @@ def calcularScoreAreaDeTrabajo(celdas):
     Concepto: El espacio vacío es funcional si sirve a un propósito, como trabajar.
     Fuente: Internal Layout...ASCEND.pdf
     """
-    MODULOS_DE_TRABAJO = ['FOOD', 'MAINTENANCE', 'SCIENCE', 'MEDICAL']
-    ocupados = {(c['x'], c['y']) for c in celdas}
+    ocupados = _tilesOcupados(celdas)
     
     workstations = [c for c in celdas if c['type'] in MODULOS_DE_TRABAJO]
     if not workstations:
@@ -214,13 +388,15 @@ def calcularScoreAreaDeTrabajo(celdas):
 
     scoresDeWorkstations = []
     for ws in workstations:
-        # Simplificación: Verificamos un área de 3x3 alrededor del módulo.
+        # Simplificación: Verificamos el anillo de 1 tile alrededor de la huella
+        # del módulo (3x3 menos el centro para un módulo 1x1).
         # Una versión más avanzada consideraría la orientación del módulo.
-        areaRequerida = 8 # 8 tiles libres alrededor
+        w, h = dimensionesHuella(ws)
+        areaRequerida = 2 * w + 2 * h + 4 # tiles libres alrededor
         tilesLibres = 0
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0: continue
+        for dx in range(-1, w + 1):
+            for dy in range(-1, h + 1):
+                if 0 <= dx < w and 0 <= dy < h: continue
                 if (ws['x'] + dx, ws['y'] + dy) not in ocupados:
                     tilesLibres += 1
         scoresDeWorkstations.append(tilesLibres / areaRequerida)
@@ -229,29 +405,24 @@ def calcularScoreAreaDeTrabajo(celdas):
     return {"scoreAreaDeTrabajo": scoreAreaDeTrabajo}
 
 
-def calcularScoreErgonomia(celdas):
+def calcularScoreErgonomia(celdas, config=None):
     """
     Puntúa la ubicación de los módulos según su frecuencia de uso.
     Concepto: Lo más usado debe estar en la ubicación más céntrica y accesible.
     Fuente: automatedEvaluation.pdf
     """
-    # Frecuencia de uso estimada (1-10)
-    FRECUENCIA_USO = {
-        'PRIVATE': 10, 'FOOD': 9, 'SOCIAL': 8, 'HYGIENE': 8,
-        'WASTE': 7, 'EXERCISE': 7, 'MEDICAL': 5, 'MAINTENANCE': 4,
-        'SCIENCE': 6, 'LOGISTICS': 3, 'AIRLOCK': 5, 'MISSION PLANNING': 7
-    }
-    
+    config = config or _configPorDefecto()
     if not celdas:
         return {"scoreErgonomia": 0}
         
-    centroHabitat = (HABITAT_WIDTH_M / 2, HABITAT_HEIGHT_M / 2)
+    centroHabitat = config.centro
     scorePonderadoTotal = 0
     frecuenciaTotal = 0
     
     for c in celdas:
-        frecuencia = FRECUENCIA_USO.get(c['type'], 1)
-        distAlCentro = math.sqrt((c['x'] - centroHabitat[0])**2 + (c['y'] - centroHabitat[1])**2)
+        frecuencia = config.frecuenciaUso.get(c['type'], 1)
+        x, y = _centroCelda(c)
+        distAlCentro = math.sqrt((x - centroHabitat[0])**2 + (y - centroHabitat[1])**2)
         
         # Un score de centralidad que es alto cuando la distancia es baja
         scoreCentralidad = 1 / (1 + distAlCentro)
@@ -263,34 +434,44 @@ def calcularScoreErgonomia(celdas):
     # El score ya está normalizado entre 0 y 1 por la naturaleza del cálculo
     return {"scoreErgonomia": scoreErgonomia}
 
+MATERIAL_SCORES = {'autonomo': 1.0, 'metal': 0.5, 'compuesto':0.6, 'inflable': 0.2}
+
 def calcularScoreSostenibilidad(materialEstructuralGlobal):
-    materialScores = {'autonomo': 1.0, 'metal': 0.5, 'compuesto':0.6, 'inflable': 0.2}
-    return {"scoreSostenibilidad": materialScores.get(materialEstructuralGlobal, 0.1)}
+    return {"scoreSostenibilidad": MATERIAL_SCORES.get(materialEstructuralGlobal, 0.1)}
 
 def calcularScoreProteccionRadiacion(resistenciaRadiacionGlobal):
     return {"scoreProteccionRadiacion": _normalize(resistenciaRadiacionGlobal, 1, 10)}
 
-def generarScoresHabitat(habitatLayout, contextoMision):
-    """Orquesta el cálculo de todos los sub-scores para un único hábitat."""
+def generarScoresHabitat(habitatLayout, contextoMision, motor='python', modoVista='exacto', config=None):
+    """
+    Orquesta el cálculo de todos los sub-scores para un único hábitat.
+
+    `motor` elige la implementación: 'python' (referencia, sobre los dicts de
+    celdas) o 'numpy' (vectorizada, devuelve exactamente los mismos valores).
+    `modoVista` se pasa a calcularScoreVistaEspacial ('exacto' o 'muestreado').
+    `config` es una ConfiguracionScoring (por defecto, la de los globales).
+    Con activarPerfilado() cada sub-score se cronometra en el colector activo.
+    """
+    calc, celdas = _prepararMotor(habitatLayout.get('cells', []), motor, modoVista)
+    config = config or _configPorDefecto()
+
     scores = {'habitatId': habitatLayout.get('id', 'N/A')}
-    celdas = habitatLayout.get('cells', [])
-    
 
     cantidadTripulacion = contextoMision.get('cantidadTripulacion', 4)
     materialEstructural = contextoMision.get('materialEstructural', 'INFLABLE')
     resistenciaRadiacion = contextoMision.get('resistenciaRadiacion', 7)
     
-    scores['scoreChecklist'] = calcularScoreChecklist(celdas, cantidadTripulacion)
+    scores['scoreChecklist'] = calc['checklist'](celdas, cantidadTripulacion)
     
     if scores['scoreChecklist'] > 0:
-        scores.update(calcularScoresIngenieria(celdas, cantidadTripulacion))
-        scores.update(calcularScoresLayout(celdas))
-        scores.update(calcularScoresTecnologicos(celdas))
-        scores.update(calcularScoreVistaEspacial(celdas))
-        scores.update(calcularScoreAreaDeTrabajo(celdas))
-        scores.update(calcularScoreErgonomia(celdas))
-        scores.update(calcularScoreSostenibilidad(materialEstructural))
-        scores.update(calcularScoreProteccionRadiacion(resistenciaRadiacion))
+        scores.update(calc['ingenieria'](celdas, cantidadTripulacion, config))
+        scores.update(calc['layout'](celdas, config))
+        scores.update(calc['tecnologicos'](celdas))
+        scores.update(calc['vistaEspacial'](celdas, modoVista, config))
+        scores.update(calc['areaDeTrabajo'](celdas))
+        scores.update(calc['ergonomia'](celdas, config))
+        scores.update(calc['sostenibilidad'](materialEstructural))
+        scores.update(calc['proteccionRadiacion'](resistenciaRadiacion))
         
     else:
         keys = ["scoreMasa", "scoreVolumen", "scoreZonificacion", 
@@ -302,6 +483,22 @@ def generarScoresHabitat(habitatLayout, contextoMision):
             
     return scores
 
+def _prepararMotor(celdas, motor, modoVista):
+    """Valida motor y modoVista; regresa (funciones del motor, celdas en el formato del motor)."""
+    if motor not in _MOTORES:
+        raise ValueError(f"Motor desconocido: {motor!r} (opciones: {', '.join(_MOTORES)})")
+    if modoVista not in MODOS_VISTA:
+        raise ValueError(f"Modo de vista desconocido: {modoVista!r} (opciones: {', '.join(MODOS_VISTA)})")
+    calc = _MOTORES[motor]
+    if _perfilador is not None:
+        calc = _perfilador.envolver(calc, len(celdas))
+    if isinstance(celdas, ColeccionCeldas):
+        # Ya viene en arreglos: el motor numpy los usa tal cual
+        celdas = celdas.empaquetar() if motor == 'numpy' else celdas.aDicts()
+    elif motor == 'numpy':
+        celdas = calc['empaquetar'](celdas)
+    return calc, celdas
+
 # Los pesos determinan la importancia de cada métrica en la calificación final.
 PONDERACIONES = {
    
@@ -320,17 +517,18 @@ PONDERACIONES = {
     "scoreAutonomia":           1.2,  # Reduce la carga de trabajo y el riesgo.
 }
 
-def calcularCalificacionFinal(subScores):
+def calcularCalificacionFinal(subScores, config=None):
     """
     Calcula una calificación final de 0 a 100 a partir de un diccionario de sub-scores,
-    aplicando una ponderación para cada métrica.
+    aplicando una ponderación para cada métrica (las de `config`, por defecto PONDERACIONES).
     """
+    ponderaciones = (config or _configPorDefecto()).ponderaciones
     puntuacionPonderadaTotal = 0.0
     sumaDePesos = 0.0
 
     for nombreScore, valorScore in subScores.items():
-        if nombreScore in PONDERACIONES:
-            peso = PONDERACIONES[nombreScore]
+        if nombreScore in ponderaciones:
+            peso = ponderaciones[nombreScore]
             puntuacionPonderadaTotal += valorScore * peso
             sumaDePesos += peso
             
@@ -345,7 +543,84 @@ def calcularCalificacionFinal(subScores):
     
     return calificacionFinal
 
-def leerHabitatDesdeJsonTiles(path):
+# Funciones del motor en orden de costo creciente (según benchmarks/benchmarkScores.py)
+# y los sub-scores que produce cada una. El raycaster de vista va al final.
+SUBSCORES_POR_COSTO = {
+    'sostenibilidad': ["scoreSostenibilidad"],
+    'proteccionRadiacion': ["scoreProteccionRadiacion"],
+    'tecnologicos': ["scoreAutonomia"],
+    'ingenieria': ["scoreMasa", "scoreVolumen", "scoreVolumenPorPersona"],
+    'ergonomia': ["scoreErgonomia"],
+    'areaDeTrabajo': ["scoreAreaDeTrabajo"],
+    'layout': ["scoreZonificacion", "scoreAdyacencias", "scorePrivacidad"],
+    'vistaEspacial': ["scoreVistaEspacial"],
+}
+
+# Margen para que el redondeo de las cotas nunca descarte un layout que alcanza el umbral
+_TOLERANCIA_COTA = 1e-9
+
+def scoreAlMenos(habitatLayout, contextoMision, umbral, motor='python', modoVista='exacto', config=None):
+    """
+    Regresa True si calcularCalificacionFinal(generarScoresHabitat(...)) >= umbral,
+    calculando solo los sub-scores necesarios para decidirlo.
+
+    Los sub-scores se evalúan en el orden de SUBSCORES_POR_COSTO. Como todos
+    están en [0, 1], con los pesos de la configuración se acota la calificación
+    final entre lo ya calculado más 0 o más 1 en cada sub-score pendiente; en
+    cuanto el umbral queda fuera de ese intervalo se deja de evaluar. Si no se
+    puede decidir antes, el resultado es idéntico al de la calificación completa.
+    """
+    calc, celdas = _prepararMotor(habitatLayout.get('cells', []), motor, modoVista)
+    config = config or _configPorDefecto()
+    ponderaciones = config.ponderaciones
+
+    cantidadTripulacion = contextoMision.get('cantidadTripulacion', 4)
+    scores = {'habitatId': habitatLayout.get('id', 'N/A')}
+    scores['scoreChecklist'] = calc['checklist'](celdas, cantidadTripulacion)
+    if scores['scoreChecklist'] <= 0:
+        # generarScoresHabitat deja todo en 0.0: la calificación final es 0
+        return 0.0 >= umbral
+
+    argumentos = {
+        'sostenibilidad': (contextoMision.get('materialEstructural', 'INFLABLE'),),
+        'proteccionRadiacion': (contextoMision.get('resistenciaRadiacion', 7),),
+        'tecnologicos': (celdas,),
+        'ingenieria': (celdas, cantidadTripulacion, config),
+        'ergonomia': (celdas, config),
+        'areaDeTrabajo': (celdas,),
+        'layout': (celdas, config),
+        'vistaEspacial': (celdas, modoVista, config),
+    }
+    pesos = {k: ponderaciones[k] for k in COLUMNAS_SCORES if k in ponderaciones}
+    sumaDePesos = sum(pesos.values())
+    if sumaDePesos == 0:
+        return 0.0 >= umbral
+
+    # Contribución ya fija y lo que aún pueden sumar/restar los pendientes
+    acumulado = pesos.get('scoreChecklist', 0.0) * scores['scoreChecklist']
+    pendientes = [k for k in pesos if k != 'scoreChecklist']
+    maxPendiente = sum(max(pesos[k], 0) for k in pendientes)
+    minPendiente = sum(min(pesos[k], 0) for k in pendientes)
+
+    for nombre, claves in SUBSCORES_POR_COSTO.items():
+        resultado = calc[nombre](*argumentos[nombre])
+        for clave in claves:
+            scores[clave] = resultado[clave]
+            if clave in pesos:
+                peso = pesos[clave]
+                acumulado += peso * resultado[clave]
+                maxPendiente -= max(peso, 0)
+                minPendiente -= min(peso, 0)
+        if (acumulado + maxPendiente) / sumaDePesos * 100 < umbral - _TOLERANCIA_COTA:
+            return False
+        if (acumulado + minPendiente) / sumaDePesos * 100 >= umbral + _TOLERANCIA_COTA:
+            return True
+
+    # Sin decidir por las cotas: misma suma (y orden) que calcularCalificacionFinal
+    ordenados = {k: scores[k] for k in COLUMNAS_SCORES}
+    return calcularCalificacionFinal(ordenados, config) >= umbral
+
+def leerHabitatDesdeJsonTiles(path, linea=0, comoColeccion=False):
     """
     Lee un JSON con estructura:
     {
@@ -353,15 +628,1282 @@ def leerHabitatDesdeJsonTiles(path):
       "contexto": [{...}]
     }
     y retorna (celdas, contexto) listos para las funciones de scoring.
+    Si `path` termina en .jsonl, toma el registro de la línea `linea`
+    (IndexError si el archivo termina antes, ValueError si la línea está vacía).
+    Con comoColeccion=True las celdas se regresan como ColeccionCeldas.
     """
-    with open(path, 'r') as f:
-        data = json.load(f)
-    celdas = data.get('cells', [])
-    # contexto es una lista, tomamos el primer elemento si existe
-    contexto = data.get('contexto', [{}])
+    if str(path).endswith('.jsonl'):
+        numeroLinea, layout, contexto = next(iterarLayoutsJsonl(path, linea), (None, None, None))
+        if numeroLinea is None:
+            raise IndexError(f"'{path}' no tiene un registro en la línea {linea}")
+        if numeroLinea != linea:
+            raise ValueError(f"La línea {linea} de '{path}' está vacía")
+        celdas = layout.get('cells', [])
+    else:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        layout, contexto = _normalizarRegistro(data)
+        celdas = layout.get('cells', [])
+    if comoColeccion:
+        celdas = ColeccionCeldas.desdeDicts(celdas)
+    return celdas, contexto
+
+def _normalizarRegistro(registro):
+    """
+    Regresa (layout, contexto) para los dos formatos de registro del proyecto:
+    {"layout": {"id", "cells"}, "contexto": {...}} (JSONdatasetGenerator) y
+    {"cells": [...], "contexto": [{...}]} (export del editor).
+    """
+    if 'layout' in registro:
+        layout = registro['layout']
+    else:
+        layout = {'id': registro.get('id', 'N/A'), 'cells': registro.get('cells', [])}
+    # contexto es una lista en el export del editor, tomamos el primer elemento si existe
+    contexto = registro.get('contexto', {})
     if isinstance(contexto, list):
         contexto = contexto[0] if contexto else {}
-    return celdas, contexto
+    return layout, contexto
+
+def iterarLayoutsJsonl(path, lineaInicial=0):
+    """
+    Lee un archivo JSON Lines (un hábitat por línea) de forma perezosa y
+    produce (numeroLinea, layout, contexto) sin cargar el archivo completo.
+    Empieza en `lineaInicial` (0 = primera línea) para poder reanudar un
+    procesamiento; las líneas vacías se ignoran.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for numeroLinea, linea in enumerate(f):
+            if numeroLinea < lineaInicial or not linea.strip():
+                continue
+            yield (numeroLinea,) + _normalizarRegistro(json.loads(linea))
+
+# --- 3. MOTOR VECTORIZADO (NUMPY) ---
+#
+# Mismos cálculos que las funciones de la sección 2, pero sobre arreglos
+# empacados. Las sumas de flotantes se hacen con np.cumsum (acumulación
+# secuencial, igual que sum()) para que los resultados sean idénticos bit a bit
+# a la implementación de referencia.
+
+# Tipos internados a códigos enteros. Los 12 módulos conocidos ocupan los
+# códigos 0-11 en el orden de COLUMNAS_CHECKLIST; cualquier otro tipo recibe un
+# código nuevo la primera vez que aparece.
+TIPOS_MODULO = [tipo for columna in COLUMNAS_CHECKLIST
+                for tipo, col in MAPA_TIPO_A_COLUMNA.items() if col == columna]
+_CODIGOS_TIPO = {tipo: codigo for codigo, tipo in enumerate(TIPOS_MODULO)}
+NUM_TIPOS_CHECKLIST = len(TIPOS_MODULO)
+
+
+def _codigoTipo(tipo):
+    """Regresa el código entero del tipo, registrándolo si es nuevo."""
+    codigo = _CODIGOS_TIPO.get(tipo)
+    if codigo is None:
+        codigo = _CODIGOS_TIPO[tipo] = len(TIPOS_MODULO)
+        TIPOS_MODULO.append(tipo)
+    return codigo
+
+
+def empaquetarCeldas(celdas):
+    """
+    Convierte la lista de celdas (dicts) en arreglos NumPy paralelos:
+    x, y, w, h (huella ya rotada), cx, cy (centro de la huella), tipo (código
+    entero), masa, limpieza y permanencia.
+    """
+    n = len(celdas)
+    huellas = np.array([dimensionesHuella(c) for c in celdas], dtype=np.int64).reshape(n, 2)
+    x = np.fromiter((c['x'] for c in celdas), dtype=np.float64, count=n)
+    y = np.fromiter((c['y'] for c in celdas), dtype=np.float64, count=n)
+    return {
+        'x': x,
+        'y': y,
+        'w': huellas[:, 0],
+        'h': huellas[:, 1],
+        'cx': x + (huellas[:, 0] - 1) / 2,
+        'cy': y + (huellas[:, 1] - 1) / 2,
+        'tipo': np.fromiter((_codigoTipo(c['type']) for c in celdas), dtype=np.int64, count=n),
+        'masa': np.fromiter((c['props'].get('masa', 0.0) for c in celdas), dtype=np.float64, count=n),
+        'limpieza': np.fromiter((c['props'].get('limpieza', -1.0) for c in celdas), dtype=np.float64, count=n),
+        'permanencia': np.fromiter((c['props'].get('permanencia', 1) for c in celdas), dtype=np.float64, count=n),
+    }
+
+
+def _sumaSecuencial(valores):
+    """Suma de izquierda a derecha (como sum()) para conservar el redondeo."""
+    if len(valores) == 0:
+        return 0
+    return np.cumsum(valores)[-1].item()
+
+
+def _codigosDe(tipos):
+    return [_codigoTipo(t) for t in tipos]
+
+
+# Los códigos 0-11 siguen el orden de COLUMNAS_CHECKLIST: el bit de la columna
+# del código i es 1 << i.
+_BITS_CODIGO = 1 << np.arange(NUM_TIPOS_CHECKLIST)
+
+
+def _calcularScoreChecklistNp(arr, cantidadTripulacion):
+    conteo = np.bincount(arr['tipo'], minlength=NUM_TIPOS_CHECKLIST)
+    if conteo[_CODIGOS_TIPO['PRIVATE']] < cantidadTripulacion:
+        return 0.0
+    mascara = int((conteo[:NUM_TIPOS_CHECKLIST] > 0) @ _BITS_CODIGO)
+    return TABLA_CHECKLIST[mascara]
+
+
+def _calcularScoresIngenieriaNp(arr, cantidadTripulacion, config=None):
+    config = config or _configPorDefecto()
+    numCeldas = len(arr['tipo'])
+    if numCeldas == 0:
+        return {"scoreMasa": 0, "scoreVolumen": 0, "scoreVolumenPorPersona": 0}
+
+    masaTotal = _sumaSecuencial(arr['masa'])
+    scoreMasa = max(0, 1 - _normalize(masaTotal, 5000, 50000))
+
+    volumenHabitable = config.area - int((arr['w'] * arr['h']).sum())
+    scoreVolumen = _normalize(math.log10(1 + max(0, volumenHabitable)), 2, 4)
+
+    volumenPorPersona = volumenHabitable / cantidadTripulacion if cantidadTripulacion > 0 else 0
+    scoreVolumenPorPersona = _normalize(volumenPorPersona, 5, 20)
+
+    return {"scoreMasa": scoreMasa, "scoreVolumen": scoreVolumen, "scoreVolumenPorPersona": scoreVolumenPorPersona}
+
+
+def _calcularScoresLayoutNp(arr, config=None):
+    x, y, tipo = arr['cx'], arr['cy'], arr['tipo']
+    maxDist = (config or _configPorDefecto()).diagonal
+
+    # --- Zonificación ---
+    limpios = arr['limpieza'] == 1.0
+    sucios = arr['limpieza'] == 0.0
+    nL, nS = int(limpios.sum()), int(sucios.sum())
+    scoreZonificacion = 0.5
+    if nL and nS:
+        cxL, cyL = _sumaSecuencial(x[limpios]) / nL, _sumaSecuencial(y[limpios]) / nL
+        cxS, cyS = _sumaSecuencial(x[sucios]) / nS, _sumaSecuencial(y[sucios]) / nS
+        distancia = math.sqrt((cxL - cxS)**2 + (cyL - cyS)**2)
+        scoreZonificacion = _normalize(distancia, 0, maxDist * 0.75)
+
+    # --- Adyacencias (la última celda de cada tipo es la que cuenta) ---
+    codigos, idxInverso = np.unique(tipo[::-1], return_index=True)
+    ultimo = dict(zip(codigos.tolist(), (len(tipo) - 1 - idxInverso).tolist()))
+    scoresPares = []
+    for modA, modB in PARES_DESEADOS:
+        a, b = ultimo.get(_CODIGOS_TIPO.get(modA)), ultimo.get(_CODIGOS_TIPO.get(modB))
+        if a is not None and b is not None:
+            dist = math.sqrt((x[a].item() - x[b].item())**2 + (y[a].item() - y[b].item())**2)
+            scoresPares.append(1 / (1 + dist))
+    scoreAdyacencias = sum(scoresPares) / len(scoresPares) if scoresPares else 0
+
+    # --- Privacidad ---
+    privados = tipo == _CODIGOS_TIPO['PRIVATE']
+    ruidosos = np.isin(tipo, _codigosDe(MODULOS_RUIDOSOS))
+    nP, nR = int(privados.sum()), int(ruidosos.sum())
+    scorePrivacidad = 0.5
+    if nP and nR:
+        dx = x[privados][:, None] - x[ruidosos][None, :]
+        dy = y[privados][:, None] - y[ruidosos][None, :]
+        distPromedio = _sumaSecuencial(np.sqrt(dx**2 + dy**2).ravel()) / (nP * nR)
+        scorePrivacidad = _normalize(distPromedio, 0, maxDist * 0.5)
+
+    return {
+        "scoreZonificacion": scoreZonificacion,
+        "scoreAdyacencias": scoreAdyacencias,
+        "scorePrivacidad": scorePrivacidad
+    }
+
+
+def _calcularScoresTecnologicosNp(arr):
+    numCeldas = len(arr['tipo'])
+    if numCeldas == 0:
+        return {"scoreSostenibilidad": 0, "scoreAutonomia": 0}
+    return {"scoreAutonomia": _normalize(_sumaSecuencial(arr['permanencia']) / numCeldas, 0, 2)}
+
+
+@lru_cache(maxsize=None)
+def _rayosMuestreados(ancho, alto):
+    """
+    Precalcula los rayos de calcularScoreVistaEspacial para un grid dado.
+
+    Regresa (muestras, limite, celda, rayo, paso):
+      - muestras: índice lineal (x * alto + y) de cada punto muestreado.
+      - limite: primer paso fuera del grid de cada rayo (o el largo máximo).
+      - celda/rayo/paso: por cada tile que cruza cada rayo, el primer paso en
+        que lo toca. Así el rayo se corta en el mínimo paso de sus tiles ocupados.
+    """
+    mi, mj = np.meshgrid(np.arange(0, ancho, 5), np.arange(0, alto, 5), indexing='ij')
+    mi, mj = mi.ravel(), mj.ravel()
+    rad = np.array([math.radians(angulo) for angulo in range(0, 360, 45)])
+    dx = np.array([math.cos(r) for r in rad])
+    dy = np.array([math.sin(r) for r in rad])
+    largo = int(ancho * 1.5)
+    pasos = np.arange(1, largo)
+
+    px = np.trunc(mi[:, None, None] + dx[None, :, None] * pasos).astype(np.int64)
+    py = np.trunc(mj[:, None, None] + dy[None, :, None] * pasos).astype(np.int64)
+    fuera = (px < 0) | (px >= ancho) | (py < 0) | (py >= alto)
+
+    numRayos = len(mi) * len(rad)
+    fuera = fuera.reshape(numRayos, len(pasos))
+    limite = np.where(fuera.any(axis=1), fuera.argmax(axis=1) + 1, largo)
+
+    celda = (px * alto + py).reshape(numRayos, len(pasos))
+    rayo = np.broadcast_to(np.arange(numRayos)[:, None], celda.shape)
+    paso = np.broadcast_to(pasos[None, :], celda.shape)
+    # Solo interesan los pasos antes de salir del grid, y de cada tile el primero.
+    valido = paso < limite[:, None]
+    valido[:, 1:] &= celda[:, 1:] != celda[:, :-1]
+    return mi * alto + mj, limite, celda[valido], rayo[valido], paso[valido]
+
+
+def _rasterizarHuellas(lay, x, y, w, h, numLayouts, ancho, alto):
+    """
+    Grids booleanos (numLayouts, ancho, alto) con los tiles cubiertos por las
+    huellas, recortadas al hábitat. Cada rectángulo suma +1/-1 en sus cuatro
+    esquinas de un arreglo de diferencias y dos sumas acumuladas lo rellenan,
+    así que el costo es O(celdas + área) sin importar el tamaño de las huellas.
+    """
+    x0, y0 = np.floor(x).astype(np.int64), np.floor(y).astype(np.int64)
+    x1, y1 = np.clip(x0 + w, 0, ancho), np.clip(y0 + h, 0, alto)
+    x0, y0 = np.clip(x0, 0, ancho), np.clip(y0, 0, alto)
+    diferencias = np.zeros((numLayouts, ancho + 1, alto + 1), dtype=np.int32)
+    for esquinaX, esquinaY, signo in ((x0, y0, 1), (x1, y0, -1), (x0, y1, -1), (x1, y1, 1)):
+        np.add.at(diferencias, (lay, esquinaX, esquinaY), signo)
+    return diferencias.cumsum(axis=1).cumsum(axis=2)[:, :ancho, :alto] > 0
+
+
+def _gridOcupacion(arr, ancho, alto):
+    """Grid booleano aplanado (x * alto + y) con los tiles ocupados dentro del hábitat."""
+    lay = np.zeros(len(arr['x']), dtype=np.int64)
+    return _rasterizarHuellas(lay, arr['x'], arr['y'], arr['w'], arr['h'], 1, ancho, alto).ravel()
+
+
+def _calcularScoreVistaEspacialNp(arr, modo='exacto', config=None):
+    config = config or _configPorDefecto()
+    ancho, alto = config.ancho, config.alto
+    ocupado = _gridOcupacion(arr, ancho, alto)
+    maxDistPosible = config.diagonal
+    if modo == 'exacto':
+        maxVistaScore = _maxVistaExacta(~ocupado.reshape(ancho, alto)).item()
+        return {"scoreVistaEspacial": _normalize(maxVistaScore, 0, maxDistPosible / 2)}
+
+    muestras, limite, celda, rayo, paso = _rayosMuestreados(ancho, alto)
+    primerBloqueo = limite.copy()
+    golpes = ocupado[celda]
+    np.minimum.at(primerBloqueo, rayo[golpes], paso[golpes])
+    longitudes = (primerBloqueo - 1).reshape(len(muestras), -1)
+
+    vistaPromedio = longitudes.sum(axis=1)[~ocupado[muestras]] / 8
+    maxVistaScore = vistaPromedio.max().item() if len(vistaPromedio) else 0
+    return {"scoreVistaEspacial": _normalize(maxVistaScore, 0, maxDistPosible / 2)}
+
+
+def _claveCoordenada(x, y):
+    """Codifica coordenadas enteras (posiblemente negativas) en una sola llave int64."""
+    return (x.astype(np.int64) << 32) + (y.astype(np.int64) + (1 << 31))
+
+
+def _tilesRectangulos(x, y, w, h):
+    """
+    Expande rectángulos a sus tiles: regresa (indice, tx, ty), con `indice` el
+    rectángulo al que pertenece cada tile.
+    """
+    area = w * h
+    indice = np.repeat(np.arange(len(area)), area)
+    local = _rangosConcatenados(np.zeros(len(area), dtype=np.int64), area)
+    return indice, x[indice] + local // h[indice], y[indice] + local % h[indice]
+
+
+def _anillosTrabajo(arr, esTrabajo):
+    """
+    Tiles del anillo alrededor de la huella de cada workstation: regresa
+    (indice de workstation, tx, ty) y el tamaño de cada anillo (2w + 2h + 4).
+    """
+    wx, wy, w, h = arr['x'][esTrabajo], arr['y'][esTrabajo], arr['w'][esTrabajo], arr['h'][esTrabajo]
+    indice, tx, ty = _tilesRectangulos(wx - 1, wy - 1, w + 2, h + 2)
+    borde = (tx < wx[indice]) | (tx >= wx[indice] + w[indice]) | (ty < wy[indice]) | (ty >= wy[indice] + h[indice])
+    return indice[borde], tx[borde], ty[borde], 2 * w + 2 * h + 4
+
+
+def _calcularScoreAreaDeTrabajoNp(arr):
+    esTrabajo = np.isin(arr['tipo'], _codigosDe(MODULOS_DE_TRABAJO))
+    if not esTrabajo.any():
+        return {"scoreAreaDeTrabajo": 0}
+
+    _, ox, oy = _tilesRectangulos(arr['x'], arr['y'], arr['w'], arr['h'])
+    ocupados = np.unique(_claveCoordenada(ox, oy))
+    indice, tx, ty, areaRequerida = _anillosTrabajo(arr, esTrabajo)
+    libres = ~np.isin(_claveCoordenada(tx, ty), ocupados)
+    tilesLibres = np.bincount(indice, weights=libres, minlength=len(areaRequerida))
+
+    scoresDeWorkstations = tilesLibres / areaRequerida
+    return {"scoreAreaDeTrabajo": _sumaSecuencial(scoresDeWorkstations) / len(scoresDeWorkstations)}
+
+
+def _calcularScoreErgonomiaNp(arr, config=None):
+    if len(arr['tipo']) == 0:
+        return {"scoreErgonomia": 0}
+
+    config = config or _configPorDefecto()
+    cx, cy = config.centro
+    frecuencia = config.frecuenciasPorCodigo()[arr['tipo']]
+    distAlCentro = np.sqrt((arr['cx'] - cx)**2 + (arr['cy'] - cy)**2)
+    scorePonderadoTotal = _sumaSecuencial(frecuencia * (1 / (1 + distAlCentro)))
+    frecuenciaTotal = int(frecuencia.sum())
+
+    scoreErgonomia = scorePonderadoTotal / frecuenciaTotal if frecuenciaTotal > 0 else 0
+    return {"scoreErgonomia": scoreErgonomia}
+
+
+# Implementaciones disponibles para generarScoresHabitat(..., motor=...)
+_MOTORES = {
+    'python': {
+        'checklist': calcularScoreChecklist,
+        'ingenieria': calcularScoresIngenieria,
+        'layout': calcularScoresLayout,
+        'tecnologicos': calcularScoresTecnologicos,
+        'vistaEspacial': calcularScoreVistaEspacial,
+        'areaDeTrabajo': calcularScoreAreaDeTrabajo,
+        'ergonomia': calcularScoreErgonomia,
+        'sostenibilidad': calcularScoreSostenibilidad,
+        'proteccionRadiacion': calcularScoreProteccionRadiacion,
+    },
+    'numpy': {
+        'checklist': _calcularScoreChecklistNp,
+        'ingenieria': _calcularScoresIngenieriaNp,
+        'layout': _calcularScoresLayoutNp,
+        'tecnologicos': _calcularScoresTecnologicosNp,
+        'vistaEspacial': _calcularScoreVistaEspacialNp,
+        'areaDeTrabajo': _calcularScoreAreaDeTrabajoNp,
+        'ergonomia': _calcularScoreErgonomiaNp,
+        'sostenibilidad': calcularScoreSostenibilidad,
+        'proteccionRadiacion': calcularScoreProteccionRadiacion,
+        'empaquetar': empaquetarCeldas,
+    },
+}
+
+# --- 3.1 SCORING POR LOTES ---
+#
+# Todas las celdas de un bloque de layouts se concatenan en arreglos planos
+# (empaque "ragged") con un arreglo `lay` que indica a qué layout pertenece cada
+# celda. Las reducciones por layout se hacen con np.bincount, que acumula en el
+# orden de entrada y por lo tanto da las mismas sumas que el motor de referencia.
+
+COLUMNAS_SCORES = [
+    "habitatId", "scoreChecklist", "scoreMasa", "scoreVolumen", "scoreVolumenPorPersona",
+    "scoreZonificacion", "scoreAdyacencias", "scorePrivacidad", "scoreAutonomia",
+    "scoreVistaEspacial", "scoreAreaDeTrabajo", "scoreErgonomia",
+    "scoreSostenibilidad", "scoreProteccionRadiacion"
+]
+
+
+def empaquetarLote(layouts):
+    """
+    Empaca las celdas de varios layouts en arreglos planos. Además de las
+    columnas de empaquetarCeldas agrega `lay` (índice del layout de cada celda)
+    y `conteo` (celdas por layout).
+    """
+    listas = [layout.get('cells', []) for layout in layouts]
+    conteo = np.fromiter((len(celdas) for celdas in listas), dtype=np.int64, count=len(listas))
+    arr = empaquetarCeldas([c for celdas in listas for c in celdas])
+    arr['lay'] = np.repeat(np.arange(len(listas)), conteo)
+    arr['conteo'] = conteo
+    return arr
+
+
+def _normalizeNp(valores, minVal, maxVal):
+    """Versión vectorizada de _normalize."""
+    if maxVal == minVal:
+        return np.full(np.shape(valores), 0.5)
+    return (np.clip(valores, minVal, maxVal) - minVal) / (maxVal - minVal)
+
+
+def _aplicarEscalar(funcion, valores):
+    """Aplica una función de `math` elemento a elemento, una vez por valor distinto."""
+    unicos, inverso = np.unique(valores, return_inverse=True)
+    return np.array([funcion(v) for v in unicos.tolist()], dtype=np.float64)[inverso]
+
+
+def _rangosConcatenados(inicios, largos):
+    """Concatena np.arange(inicio, inicio + largo) para cada par, sin ciclos de Python."""
+    total = int(largos.sum())
+    desplazamiento = np.repeat(inicios - (np.cumsum(largos) - largos), largos)
+    return np.arange(total) + desplazamiento
+
+
+def _dividir(numerador, denominador, porDefecto):
+    """numerador / denominador donde denominador > 0, `porDefecto` en otro caso."""
+    resultado = np.full(np.shape(numerador), porDefecto, dtype=np.float64)
+    np.divide(numerador, denominador, out=resultado, where=denominador > 0)
+    return resultado
+
+
+def _sumaPorLayout(arr, pesos, mascara=None, numLayouts=None):
+    lay = arr['lay'] if mascara is None else arr['lay'][mascara]
+    return np.bincount(lay, weights=pesos, minlength=numLayouts)
+
+
+def histogramasDeTipos(arr):
+    """Conteo de celdas por (layout, código de tipo) de un lote empacado: (numLayouts, len(TIPOS_MODULO))."""
+    numLayouts = len(arr['conteo'])
+    numTipos = len(TIPOS_MODULO)
+    return np.bincount(arr['lay'] * numTipos + arr['tipo'],
+                       minlength=numLayouts * numTipos).reshape(numLayouts, numTipos)
+
+
+def calcularScoreChecklistLote(histogramas, tripulacion):
+    """
+    Versión vectorizada de calcularScoreChecklist para muchos hábitats a la vez.
+
+    `histogramas` es un arreglo (numHabitats, numTipos) con la cantidad de
+    celdas de cada código de tipo (columnas en el orden de TIPOS_MODULO, p. ej.
+    de histogramasDeTipos) y `tripulacion` un escalar o un arreglo por hábitat.
+    """
+    histogramas = np.asarray(histogramas)
+    mascaras = (histogramas[:, :NUM_TIPOS_CHECKLIST] > 0) @ _BITS_CODIGO
+    score = TABLA_CHECKLIST_NP[mascaras]
+    return np.where(histogramas[:, _CODIGOS_TIPO['PRIVATE']] < tripulacion, 0.0, score)
+
+
+def _checklistLote(arr, tripulacion):
+    return calcularScoreChecklistLote(histogramasDeTipos(arr), tripulacion)
+
+
+def _ingenieriaLote(arr, tripulacion, config):
+    numLayouts = len(arr['conteo'])
+    masaTotal = _sumaPorLayout(arr, arr['masa'], numLayouts=numLayouts)
+    scoreMasa = np.maximum(0, 1 - _normalizeNp(masaTotal, 5000, 50000))
+
+    volumenHabitable = config.area - np.bincount(arr['lay'], weights=arr['w'] * arr['h'], minlength=numLayouts)
+    scoreVolumen = _normalizeNp(_aplicarEscalar(math.log10, 1 + np.maximum(0, volumenHabitable)), 2, 4)
+    volumenPorPersona = _dividir(volumenHabitable, tripulacion, 0)
+    return {"scoreMasa": scoreMasa, "scoreVolumen": scoreVolumen,
+            "scoreVolumenPorPersona": _normalizeNp(volumenPorPersona, 5, 20)}
+
+
+def _layoutLote(arr, config):
+    numLayouts = len(arr['conteo'])
+    x, y, tipo, lay = arr['cx'], arr['cy'], arr['tipo'], arr['lay']
+    maxDist = config.diagonal
+
+    # --- Zonificación ---
+    limpios = arr['limpieza'] == 1.0
+    sucios = arr['limpieza'] == 0.0
+    nL = np.bincount(lay[limpios], minlength=numLayouts)
+    nS = np.bincount(lay[sucios], minlength=numLayouts)
+    cxL = _dividir(_sumaPorLayout(arr, x[limpios], limpios, numLayouts), nL, 0)
+    cyL = _dividir(_sumaPorLayout(arr, y[limpios], limpios, numLayouts), nL, 0)
+    cxS = _dividir(_sumaPorLayout(arr, x[sucios], sucios, numLayouts), nS, 0)
+    cyS = _dividir(_sumaPorLayout(arr, y[sucios], sucios, numLayouts), nS, 0)
+    distancia = np.sqrt((cxL - cxS)**2 + (cyL - cyS)**2)
+    scoreZonificacion = np.where((nL > 0) & (nS > 0), _normalizeNp(distancia, 0, maxDist * 0.75), 0.5)
+
+    # --- Adyacencias (la última celda de cada tipo es la que cuenta) ---
+    numTipos = len(TIPOS_MODULO)
+    ultimo = np.full(numLayouts * numTipos, -1)
+    np.maximum.at(ultimo, lay * numTipos + tipo, np.arange(len(tipo)))
+    ultimo = ultimo.reshape(numLayouts, numTipos)
+    sumaPares = np.zeros(numLayouts)
+    numPares = np.zeros(numLayouts, dtype=np.int64)
+    for modA, modB in PARES_DESEADOS:
+        codA, codB = _CODIGOS_TIPO.get(modA), _CODIGOS_TIPO.get(modB)
+        if codA is None or codB is None:
+            continue
+        a, b = ultimo[:, codA], ultimo[:, codB]
+        presentes = (a >= 0) & (b >= 0)
+        dist = np.sqrt((x[a] - x[b])**2 + (y[a] - y[b])**2)
+        sumaPares += np.where(presentes, 1 / (1 + dist), 0.0)
+        numPares += presentes
+    scoreAdyacencias = _dividir(sumaPares, numPares, 0)
+
+    # --- Privacidad: todos los pares privado x ruidoso de cada layout ---
+    privados = np.flatnonzero(tipo == _CODIGOS_TIPO['PRIVATE'])
+    ruidosos = np.flatnonzero(np.isin(tipo, _codigosDe(MODULOS_RUIDOSOS)))
+    nP = np.bincount(lay[privados], minlength=numLayouts)
+    nR = np.bincount(lay[ruidosos], minlength=numLayouts)
+    inicioR = np.cumsum(nR) - nR
+    repeticiones = nR[lay[privados]]
+    p = np.repeat(privados, repeticiones)
+    r = ruidosos[_rangosConcatenados(inicioR[lay[privados]], repeticiones)]
+    distancias = np.sqrt((x[p] - x[r])**2 + (y[p] - y[r])**2)
+    distPromedio = _dividir(np.bincount(lay[p], weights=distancias, minlength=numLayouts), nP * nR, 0)
+    scorePrivacidad = np.where((nP > 0) & (nR > 0), _normalizeNp(distPromedio, 0, maxDist * 0.5), 0.5)
+
+    return {"scoreZonificacion": scoreZonificacion, "scoreAdyacencias": scoreAdyacencias,
+            "scorePrivacidad": scorePrivacidad}
+
+
+@lru_cache(maxsize=None)
+def _rayosPorCelda(ancho, alto):
+    """Entradas de _rayosMuestreados agrupadas por tile (formato CSR)."""
+    _, _, celda, rayo, paso = _rayosMuestreados(ancho, alto)
+    orden = np.argsort(celda, kind='stable')
+    inicio = np.searchsorted(celda[orden], np.arange(ancho * alto + 1))
+    return inicio, rayo[orden], paso[orden]
+
+
+def _vistaEspacialLote(arr, modo, config):
+    numLayouts = len(arr['conteo'])
+    ancho, alto = config.ancho, config.alto
+    maxDistPosible = config.diagonal
+
+    ocupado = _rasterizarHuellas(arr['lay'], arr['x'], arr['y'], arr['w'], arr['h'], numLayouts, ancho, alto)
+
+    if modo == 'exacto':
+        maxVistaScore = _maxVistaExacta(~ocupado)
+        return {"scoreVistaEspacial": _normalizeNp(maxVistaScore, 0, maxDistPosible / 2)}
+
+    muestras, limite, _, _, _ = _rayosMuestreados(ancho, alto)
+    inicio, rayo, paso = _rayosPorCelda(ancho, alto)
+    numRayos = len(limite)
+    ocupadas = np.flatnonzero(ocupado.ravel())
+    layOcupada, celdaOcupada = np.divmod(ocupadas, ancho * alto)
+
+    # Cada tile ocupado corta los rayos que pasan por él.
+    largos = inicio[celdaOcupada + 1] - inicio[celdaOcupada]
+    entradas = _rangosConcatenados(inicio[celdaOcupada], largos)
+    primerBloqueo = np.tile(limite, numLayouts)
+    np.minimum.at(primerBloqueo, np.repeat(layOcupada, largos) * numRayos + rayo[entradas], paso[entradas])
+    vistaPromedio = (primerBloqueo - 1).reshape(numLayouts, len(muestras), -1).sum(axis=2) / 8
+
+    # Los puntos de muestra ocupados no cuentan.
+    indiceMuestra = np.full(ancho * alto, -1)
+    indiceMuestra[muestras] = np.arange(len(muestras))
+    enMuestra = indiceMuestra[celdaOcupada] >= 0
+    vistaPromedio[layOcupada[enMuestra], indiceMuestra[celdaOcupada[enMuestra]]] = 0
+    maxVistaScore = vistaPromedio.max(axis=1) if len(muestras) else np.zeros(numLayouts)
+
+    return {"scoreVistaEspacial": _normalizeNp(maxVistaScore, 0, maxDistPosible / 2)}
+
+
+def _areaDeTrabajoLote(arr):
+    numLayouts = len(arr['conteo'])
+    lay = arr['lay']
+    esTrabajo = np.isin(arr['tipo'], _codigosDe(MODULOS_DE_TRABAJO))
+
+    # Llave (layout, x, y) para probar ocupación de todos los vecinos a la vez.
+    def clave(layouts, x, y):
+        return (layouts << 42) + ((x.astype(np.int64) + (1 << 20)) << 21) + (y.astype(np.int64) + (1 << 20))
+
+    indice, ox, oy = _tilesRectangulos(arr['x'], arr['y'], arr['w'], arr['h'])
+    ocupados = np.unique(clave(lay[indice], ox, oy))
+    wLay = lay[esTrabajo]
+    indice, tx, ty, areaRequerida = _anillosTrabajo(arr, esTrabajo)
+    libres = ~np.isin(clave(wLay[indice], tx, ty), ocupados)
+    tilesLibres = np.bincount(indice, weights=libres, minlength=len(wLay))
+
+    numWorkstations = np.bincount(wLay, minlength=numLayouts)
+    suma = np.bincount(wLay, weights=tilesLibres / areaRequerida, minlength=numLayouts)
+    return {"scoreAreaDeTrabajo": _dividir(suma, numWorkstations, 0)}
+
+
+def _ergonomiaLote(arr, config):
+    numLayouts = len(arr['conteo'])
+    cx, cy = config.centro
+    frecuencia = config.frecuenciasPorCodigo()[arr['tipo']]
+    distAlCentro = np.sqrt((arr['cx'] - cx)**2 + (arr['cy'] - cy)**2)
+    scorePonderadoTotal = _sumaPorLayout(arr, frecuencia * (1 / (1 + distAlCentro)), numLayouts=numLayouts)
+    frecuenciaTotal = _sumaPorLayout(arr, frecuencia, numLayouts=numLayouts)
+    return {"scoreErgonomia": _dividir(scorePonderadoTotal, frecuenciaTotal, 0)}
+
+
+def _scoresBloque(layouts, contextos, modoVista, config):
+    """Calcula las columnas de scores para un bloque de layouts."""
+    numLayouts = len(layouts)
+    tripulacion = np.array([c.get('cantidadTripulacion', 4) for c in contextos], dtype=np.float64)
+    material = [c.get('materialEstructural', 'INFLABLE') for c in contextos]
+    radiacion = np.array([c.get('resistenciaRadiacion', 7) for c in contextos], dtype=np.float64)
+
+    arr = empaquetarLote(layouts)
+    columnas = {"scoreChecklist": _checklistLote(arr, tripulacion)}
+    for columna in COLUMNAS_SCORES[2:]:
+        columnas[columna] = np.zeros(numLayouts)
+
+    # Igual que generarScoresHabitat: solo se evalúan los layouts con checklist > 0.
+    activos = np.flatnonzero(columnas["scoreChecklist"] > 0)
+    if len(activos):
+        enActivos = np.isin(arr['lay'], activos)
+        sub = {k: v[enActivos] for k, v in arr.items() if k not in ('lay', 'conteo')}
+        sub['lay'] = np.searchsorted(activos, arr['lay'][enActivos])
+        sub['conteo'] = arr['conteo'][activos]
+
+        parciales = {}
+        parciales.update(_ingenieriaLote(sub, tripulacion[activos], config))
+        parciales.update(_layoutLote(sub, config))
+        parciales["scoreAutonomia"] = _normalizeNp(
+            _dividir(_sumaPorLayout(sub, sub['permanencia'], numLayouts=len(activos)), sub['conteo'], 0), 0, 2)
+        parciales.update(_vistaEspacialLote(sub, modoVista, config))
+        parciales.update(_areaDeTrabajoLote(sub))
+        parciales.update(_ergonomiaLote(sub, config))
+        parciales["scoreSostenibilidad"] = np.array(
+            [MATERIAL_SCORES.get(material[i], 0.1) for i in activos.tolist()])
+        parciales["scoreProteccionRadiacion"] = _normalizeNp(radiacion[activos], 1, 10)
+        for columna, valores in parciales.items():
+            columnas[columna][activos] = valores
+
+    columnas["habitatId"] = [layout.get('id', 'N/A') for layout in layouts]
+    return columnas
+
+
+def generarScoresLote(layouts, contextos, tamanoBloque=1024, modoVista='exacto', config=None):
+    """
+    Calcula los sub-scores de muchos hábitats en una sola llamada.
+
+    `layouts` es una lista de layouts ({'id', 'cells'}) y `contextos` una lista
+    paralela de contextos de misión (o un solo dict para todos). Regresa un
+    DataFrame con una fila por hábitat y las mismas columnas (y valores) que
+    generarScoresHabitat. Los layouts se procesan en bloques de `tamanoBloque`
+    para acotar la memoria. `config` como en generarScoresHabitat.
+    """
+    config = config or _configPorDefecto()
+    if modoVista not in MODOS_VISTA:
+        raise ValueError(f"Modo de vista desconocido: {modoVista!r} (opciones: {', '.join(MODOS_VISTA)})")
+    layouts = list(layouts)
+    if isinstance(contextos, dict):
+        contextos = [contextos] * len(layouts)
+    else:
+        contextos = list(contextos)
+    if len(contextos) != len(layouts):
+        raise ValueError(f"Se recibieron {len(layouts)} layouts pero {len(contextos)} contextos")
+
+    bloques = [_scoresBloque(layouts[i:i + tamanoBloque], contextos[i:i + tamanoBloque], modoVista, config)
+               for i in range(0, len(layouts), tamanoBloque)]
+    if not bloques:
+        return pd.DataFrame(columns=COLUMNAS_SCORES)
+    return pd.DataFrame({
+        columna: np.concatenate([np.asarray(b[columna], dtype=object if columna == "habitatId" else None)
+                                 for b in bloques])
+        for columna in COLUMNAS_SCORES
+    })
+
+
+# --- 3.2 SCORING INCREMENTAL ---
+
+DIRECCIONES_VISTA = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)]
+
+
+class EvaluadorIncremental:
+    """
+    Mantiene agregados de un hábitat (sumas de masa, centroides limpio/sucio,
+    distancias privado-ruidoso, grid de ocupación con sus corridas de visión,
+    posiciones por tipo...) para que agregar o quitar una celda cueste
+    O(área afectada) en lugar de recalcular todo el hábitat.
+
+    Cada celda se registra con una `clave` hashable elegida por el llamador
+    (p. ej. el bloque del editor). scores() regresa el mismo dict que
+    generarScoresHabitat (modoVista='exacto'), salvo redondeo en las sumas de
+    flotantes, y se memoiza hasta el siguiente cambio. `config` como en
+    generarScoresHabitat.
+    """
+
+    def __init__(self, contextoMision=None, celdas=(), habitatId='N/A', config=None):
+        self.contexto = contextoMision or {}
+        self.habitatId = habitatId
+        self.config = config or _configPorDefecto()
+        self.ancho, self.alto = self.config.ancho, self.config.alto
+        self._celdas = {}
+        self._conteoTipos = {}
+        self._posicionesPorTipo = {}
+        self._masaTotal = 0.0
+        self._sumaPermanencia = 0
+        self._areaOcupada = 0
+        self._zonas = {1.0: [0, 0, 0], 0.0: [0, 0, 0]}  # limpieza -> [sumaX, sumaY, n]
+        self._privados, self._ruidosos = {}, {}
+        self._sumaDistPrivacidad = 0.0
+        self._sumaErgonomia = 0.0
+        self._frecuenciaTotal = 0
+
+        self._ocupacion = {}
+        # tile -> {tamaño de anillo: workstations cuyo anillo pasa por el tile}
+        self._anillosEn = {}
+        self._numTrabajo = 0
+        self._libresTrabajo = {}  # tamaño de anillo -> tiles libres en esos anillos
+
+        # Corridas libres por dirección sobre un grid vacío: distancia al borde.
+        # El grid de vista cuenta cuántos tiles cubren cada celda entera
+        # (math.floor, como calcularScoreVistaEspacial), así que coordenadas
+        # no enteras caen en el mismo tile que en el scoring completo.
+        ancho, alto = self.ancho, self.alto
+        self._libre = np.ones((ancho, alto), dtype=bool)
+        self._cubiertos = np.zeros((ancho, alto), dtype=np.int32)
+        gx, gy = np.meshgrid(np.arange(ancho), np.arange(alto), indexing='ij')
+        hastaBorde = {1: (ancho - 1 - gx, alto - 1 - gy), -1: (gx, gy)}
+        self._corridas = np.empty((len(DIRECCIONES_VISTA), ancho, alto), dtype=np.int32)
+        for k, (dx, dy) in enumerate(DIRECCIONES_VISTA):
+            limites = ([hastaBorde[dx][0]] if dx else []) + ([hastaBorde[dy][1]] if dy else [])
+            self._corridas[k] = np.minimum.reduce(limites)
+        self._sumaEjes = self._corridas[:4].sum(axis=0)
+        self._sumaDiagonales = self._corridas[4:].sum(axis=0)
+
+        self._scores = None
+        for clave, celda in celdas:
+            self.agregarCelda(clave, celda)
+
+    def __len__(self):
+        return len(self._celdas)
+
+    def __contains__(self, clave):
+        return clave in self._celdas
+
+    def celdas(self):
+        """
+        Celdas actuales en orden de inserción (re-agregar una clave la manda al
+        final). Es el orden que reproduce scores() en generarScoresHabitat.
+        """
+        return list(self._celdas.values())
+
+    # --- Ediciones ---
+
+    def agregarCelda(self, clave, celda):
+        if clave in self._celdas:
+            self.quitarCelda(clave)
+        tipo, props = celda['type'], celda['props']
+        w, h = dimensionesHuella(celda)
+        x, y = _centroCelda(celda)
+        self._celdas[clave] = celda
+        self._scores = None
+
+        self._conteoTipos[tipo] = self._conteoTipos.get(tipo, 0) + 1
+        self._posicionesPorTipo.setdefault(tipo, {})[clave] = (x, y)
+        self._masaTotal += props.get('masa', 0.0)
+        self._sumaPermanencia += props.get('permanencia', 1)
+        self._areaOcupada += w * h
+        self._actualizarZona(props.get('limpieza'), x, y, 1)
+
+        if tipo == 'PRIVATE':
+            self._sumaDistPrivacidad += self._sumaDistancias(x, y, self._ruidosos)
+            self._privados[clave] = (x, y)
+        if tipo in MODULOS_RUIDOSOS:
+            self._sumaDistPrivacidad += self._sumaDistancias(x, y, self._privados)
+            self._ruidosos[clave] = (x, y)
+
+        frecuencia = self.config.frecuenciaUso.get(tipo, 1)
+        self._sumaErgonomia += frecuencia * self._centralidad(x, y)
+        self._frecuenciaTotal += frecuencia
+
+        for tile in self._tilesHuella(celda['x'], celda['y'], w, h):
+            self._ocupar(tile, 1)
+        if tipo in MODULOS_DE_TRABAJO:
+            self._registrarAnillo(celda['x'], celda['y'], w, h, 1)
+            self._numTrabajo += 1
+
+    def quitarCelda(self, clave):
+        celda = self._celdas.pop(clave, None)
+        if celda is None:
+            return
+        tipo, props = celda['type'], celda['props']
+        w, h = dimensionesHuella(celda)
+        x, y = _centroCelda(celda)
+        self._scores = None
+
+        self._conteoTipos[tipo] -= 1
+        del self._posicionesPorTipo[tipo][clave]
+        self._masaTotal -= props.get('masa', 0.0)
+        self._sumaPermanencia -= props.get('permanencia', 1)
+        self._areaOcupada -= w * h
+        self._actualizarZona(props.get('limpieza'), x, y, -1)
+
+        if tipo == 'PRIVATE':
+            del self._privados[clave]
+            self._sumaDistPrivacidad -= self._sumaDistancias(x, y, self._ruidosos)
+        if tipo in MODULOS_RUIDOSOS:
+            del self._ruidosos[clave]
+            self._sumaDistPrivacidad -= self._sumaDistancias(x, y, self._privados)
+
+        frecuencia = self.config.frecuenciaUso.get(tipo, 1)
+        self._sumaErgonomia -= frecuencia * self._centralidad(x, y)
+        self._frecuenciaTotal -= frecuencia
+
+        if tipo in MODULOS_DE_TRABAJO:
+            self._registrarAnillo(celda['x'], celda['y'], w, h, -1)
+            self._numTrabajo -= 1
+        for tile in self._tilesHuella(celda['x'], celda['y'], w, h):
+            self._ocupar(tile, -1)
+
+    # --- Agregados ---
+
+    def _actualizarZona(self, limpieza, x, y, signo):
+        zona = self._zonas.get(limpieza)
+        if zona is not None:
+            zona[0] += signo * x
+            zona[1] += signo * y
+            zona[2] += signo
+
+    @staticmethod
+    def _sumaDistancias(x, y, posiciones):
+        return sum(math.sqrt((x - ox)**2 + (y - oy)**2) for ox, oy in posiciones.values())
+
+    def _centralidad(self, x, y):
+        cx, cy = self.config.centro
+        return 1 / (1 + math.sqrt((x - cx)**2 + (y - cy)**2))
+
+    @staticmethod
+    def _tilesHuella(x, y, w, h):
+        return [(x + dx, y + dy) for dx in range(w) for dy in range(h)]
+
+    def _registrarAnillo(self, x, y, w, h, signo):
+        """Agrega (signo=1) o quita (-1) el anillo alrededor de la huella de una workstation."""
+        tamano = 2 * w + 2 * h + 4
+        libres = 0
+        for tile in self._tilesHuella(x - 1, y - 1, w + 2, h + 2):
+            if x <= tile[0] < x + w and y <= tile[1] < y + h:
+                continue
+            anillos = self._anillosEn.setdefault(tile, {})
+            anillos[tamano] = anillos.get(tamano, 0) + signo
+            if not anillos[tamano]:
+                del anillos[tamano]
+                if not anillos:
+                    del self._anillosEn[tile]
+            libres += not self._ocupacion.get(tile)
+        self._libresTrabajo[tamano] = self._libresTrabajo.get(tamano, 0) + signo * libres
+
+    def _ocupar(self, tile, signo):
+        """Actualiza la ocupación del tile; solo hay trabajo extra si cambia de libre a ocupado o viceversa."""
+        antes = self._ocupacion.get(tile, 0)
+        despues = antes + signo
+        if despues:
+            self._ocupacion[tile] = despues
+        else:
+            del self._ocupacion[tile]
+        if (antes == 0) != (despues == 0):
+            cambio = -signo  # +1 si el tile queda libre, -1 si queda ocupado
+            for tamano, cantidad in self._anillosEn.get(tile, {}).items():
+                self._libresTrabajo[tamano] += cambio * cantidad
+        x, y = math.floor(tile[0]), math.floor(tile[1])
+        if 0 <= x < self.ancho and 0 <= y < self.alto:
+            self._cubiertos[x, y] += signo
+            if self._libre[x, y] != (self._cubiertos[x, y] == 0):
+                self._libre[x, y] = not self._libre[x, y]
+                self._actualizarCorridas(x, y)
+
+    def _actualizarCorridas(self, x, y):
+        """
+        Recalcula las corridas de los tiles cuya línea de visión pasa por (x, y):
+        en cada dirección, hacia atrás hasta donde el valor deja de cambiar.
+        """
+        for k, (dx, dy) in enumerate(DIRECCIONES_VISTA):
+            corrida = self._corridas[k]
+            suma = self._sumaDiagonales if dx and dy else self._sumaEjes
+            px, py = x - dx, y - dy
+            while 0 <= px < self.ancho and 0 <= py < self.alto:
+                siguiente = (px + dx, py + dy)
+                nuevo = int(corrida[siguiente]) + 1 if self._libre[siguiente] else 0
+                delta = nuevo - int(corrida[px, py])
+                if delta == 0:
+                    break
+                corrida[px, py] = nuevo
+                suma[px, py] += delta
+                px, py = px - dx, py - dy
+
+    # --- Scores ---
+
+    def scores(self):
+        if self._scores is None:
+            self._scores = self._calcularScores()
+        return dict(self._scores)
+
+    def calificacion(self):
+        return calcularCalificacionFinal(self.scores(), self.config)
+
+    def _calcularScores(self):
+        contexto = self.contexto
+        cantidadTripulacion = contexto.get('cantidadTripulacion', 4)
+        scores = {'habitatId': self.habitatId}
+
+        if self._conteoTipos.get('PRIVATE', 0) < cantidadTripulacion:
+            scores['scoreChecklist'] = 0.0
+        else:
+            presentes = (tipo for tipo, n in self._conteoTipos.items() if n)
+            scores['scoreChecklist'] = TABLA_CHECKLIST[_mascaraChecklist(presentes)]
+
+        if scores['scoreChecklist'] <= 0:
+            for key in COLUMNAS_SCORES[2:]:
+                scores[key] = 0.0
+            return scores
+
+        numCeldas = len(self._celdas)
+        maxDist = self.config.diagonal
+
+        # Ingeniería
+        scores['scoreMasa'] = max(0, 1 - _normalize(self._masaTotal, 5000, 50000))
+        volumenHabitable = self.config.area - self._areaOcupada
+        scores['scoreVolumen'] = _normalize(math.log10(1 + max(0, volumenHabitable)), 2, 4)
+        volumenPorPersona = volumenHabitable / cantidadTripulacion if cantidadTripulacion > 0 else 0
+        scores['scoreVolumenPorPersona'] = _normalize(volumenPorPersona, 5, 20)
+
+        # Layout
+        (sxL, syL, nL), (sxS, syS, nS) = self._zonas[1.0], self._zonas[0.0]
+        scores['scoreZonificacion'] = 0.5
+        if nL and nS:
+            distancia = math.sqrt((sxL / nL - sxS / nS)**2 + (syL / nL - syS / nS)**2)
+            scores['scoreZonificacion'] = _normalize(distancia, 0, maxDist * 0.75)
+
+        scoresPares = []
+        for modA, modB in PARES_DESEADOS:
+            posA, posB = self._posicionesPorTipo.get(modA), self._posicionesPorTipo.get(modB)
+            if posA and posB:
+                (ax, ay), (bx, by) = next(reversed(posA.values())), next(reversed(posB.values()))
+                scoresPares.append(1 / (1 + math.sqrt((ax - bx)**2 + (ay - by)**2)))
+        scores['scoreAdyacencias'] = sum(scoresPares) / len(scoresPares) if scoresPares else 0
+
+        scores['scorePrivacidad'] = 0.5
+        if self._privados and self._ruidosos:
+            distPromedio = self._sumaDistPrivacidad / (len(self._privados) * len(self._ruidosos))
+            scores['scorePrivacidad'] = _normalize(distPromedio, 0, maxDist * 0.5)
+
+        scores['scoreAutonomia'] = _normalize(self._sumaPermanencia / numCeldas, 0, 2)
+
+        vistaPromedio = (self._sumaEjes + math.sqrt(2) * self._sumaDiagonales) / 8
+        vistaPromedio[~self._libre] = 0
+        scores['scoreVistaEspacial'] = _normalize(vistaPromedio.max().item(), 0, maxDist / 2)
+
+        scores['scoreAreaDeTrabajo'] = 0
+        if self._numTrabajo:
+            sumaAnillos = sum(libres / tamano for tamano, libres in sorted(self._libresTrabajo.items()))
+            scores['scoreAreaDeTrabajo'] = sumaAnillos / self._numTrabajo
+        scores['scoreErgonomia'] = self._sumaErgonomia / self._frecuenciaTotal if self._frecuenciaTotal > 0 else 0
+        scores.update(calcularScoreSostenibilidad(contexto.get('materialEstructural', 'INFLABLE')))
+        scores.update(calcularScoreProteccionRadiacion(contexto.get('resistenciaRadiacion', 7)))
+        return scores
+
+
+# --- 3.3 PERFILADO ---
+#
+# Instrumentación opcional de generarScoresHabitat. Desactivada (por defecto)
+# sólo cuesta una comparación por llamada; activada, cada sub-score se
+# envuelve en un cronómetro que acumula en el colector.
+
+class ColectorPerfil:
+    """
+    Acumula llamadas y tiempo (perf_counter) por función de sub-score y por
+    rango de tamaño del layout (número de celdas).
+    """
+    LIMITES_TAMANO = (16, 64, 256, 1024)
+
+    def __init__(self):
+        self._datos = {}  # (funcion, rango) -> [llamadas, segundos]
+
+    def reiniciar(self):
+        self._datos.clear()
+
+    @classmethod
+    def rangoTamano(cls, numCeldas):
+        inferior = 0
+        for limite in cls.LIMITES_TAMANO:
+            if numCeldas <= limite:
+                return f"{inferior}-{limite}"
+            inferior = limite + 1
+        return f">{cls.LIMITES_TAMANO[-1]}"
+
+    def registrar(self, funcion, numCeldas, segundos):
+        self._acumular(funcion, self.rangoTamano(numCeldas), segundos)
+
+    def _acumular(self, funcion, rango, segundos):
+        entrada = self._datos.get((funcion, rango))
+        if entrada is None:
+            entrada = self._datos[(funcion, rango)] = [0, 0.0]
+        entrada[0] += 1
+        entrada[1] += segundos
+
+    def envolver(self, calc, numCeldas):
+        """Copia del dict de funciones de un motor con cada función cronometrada."""
+        rango = self.rangoTamano(numCeldas)
+        return {clave: self._cronometrar(funcion, rango) for clave, funcion in calc.items()}
+
+    def _cronometrar(self, funcion, rango):
+        nombre = funcion.__name__
+        def medida(*args):
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args)
+            finally:
+                self._acumular(nombre, rango, time.perf_counter() - inicio)
+        return medida
+
+    def filas(self):
+        return [{'funcion': funcion, 'rangoCeldas': rango, 'llamadas': llamadas,
+                 'segundosTotales': segundos, 'msPorLlamada': 1000 * segundos / llamadas}
+                for (funcion, rango), (llamadas, segundos) in self._datos.items()]
+
+    def tabla(self):
+        """DataFrame ordenado por tiempo total, de mayor a menor."""
+        columnas = ['funcion', 'rangoCeldas', 'llamadas', 'segundosTotales', 'msPorLlamada']
+        return pd.DataFrame(self.filas(), columns=columnas).sort_values('segundosTotales', ascending=False, ignore_index=True)
+
+    def exportar(self, path):
+        """Guarda las filas en CSV, o en JSON si `path` termina en .json."""
+        if str(path).endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump(self.filas(), f, indent=2)
+        else:
+            self.tabla().to_csv(path, index=False)
+
+    def __str__(self):
+        return self.tabla().to_string(index=False)
+
+_perfilador = None
+
+def activarPerfilado(colector=None):
+    """Empieza a cronometrar generarScoresHabitat; regresa el colector en uso."""
+    global _perfilador
+    _perfilador = colector if colector is not None else ColectorPerfil()
+    return _perfilador
+
+def desactivarPerfilado():
+    """Deja de cronometrar y regresa el colector (o None si no había)."""
+    global _perfilador
+    colector, _perfilador = _perfilador, None
+    return colector
+
+# --- 3.4 CACHÉ DE SCORES ---
+#
+# Memoiza generarScoresHabitat por contenido: la llave es un sha256 del layout
+# canónico, el contexto, el modo de vista, la configuración y la versión del
+# scorer. Las celdas conservan su orden (scoreAdyacencias usa la última celda
+# de cada tipo), pero no importan el id del hábitat, el orden de las llaves ni
+# cómo se escribió la huella.
+
+def _versionScoring():
+    """Hash del código de este módulo: cualquier cambio invalida las entradas guardadas."""
+    try:
+        with open(__file__, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError:
+        return 'desconocida'
+
+VERSION_SCORING = _versionScoring()
+
+
+def _celdaCanonica(celda):
+    # Sólo los props que usa el scoring, como float (0 y 0.0 dan la misma llave)
+    w, h = dimensionesHuella(celda)
+    props = celda.get('props', {})
+    return [celda['x'], celda['y'], w, h, celda['type'],
+            {campo: float(props[campo]) for campo in CAMPOS_PROPS if campo in props}]
+
+def claveScores(habitatLayout, contextoMision, modoVista='exacto', config=None):
+    """Llave de contenido (hex sha256) de los sub-scores de un hábitat."""
+    config = config or _configPorDefecto()
+    celdas = habitatLayout.get('cells', [])
+    if isinstance(celdas, ColeccionCeldas):
+        celdas = celdas.aDicts()
+    contenido = {
+        'cells': [_celdaCanonica(c) for c in celdas],
+        'contexto': contextoMision,
+        'modoVista': modoVista,
+        'config': [config.ancho, config.alto, config.frecuenciaUso],
+        'version': VERSION_SCORING,
+    }
+    texto = json.dumps(contenido, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+class CacheScores:
+    """
+    Caché de sub-scores con LRU en memoria (hasta `maxEntradas`) y, si se da
+    `pathDisco`, respaldo en SQLite que sobrevive entre procesos. Las escrituras
+    a disco se confirman cada ESCRITURAS_POR_COMMIT entradas y al cerrar.
+    Se puede compartir entre hilos (p. ej. el que alimenta un Pool.imap).
+
+        with CacheScores(pathDisco='scores_cache.sqlite') as cache:
+            scores = cache.generarScores(layout, contexto)
+    """
+    ESCRITURAS_POR_COMMIT = 256
+
+    def __init__(self, maxEntradas=4096, pathDisco=None):
+        self.maxEntradas = maxEntradas
+        self._memoria = OrderedDict()
+        self._conexion = None
+        self._pendientes = 0
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        if pathDisco is not None:
+            self._conexion = sqlite3.connect(str(pathDisco), timeout=30, check_same_thread=False)
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+            self._conexion.execute("CREATE TABLE IF NOT EXISTS scores (clave TEXT PRIMARY KEY, scores TEXT NOT NULL)")
+            self._conexion.commit()
+
+    def __len__(self):
+        return len(self._memoria)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def obtener(self, clave):
+        """Sub-scores guardados para `clave` (sin habitatId), o None."""
+        with self._candado:
+            scores = self._memoria.get(clave)
+            if scores is not None:
+                self._memoria.move_to_end(clave)
+                return scores
+            if self._conexion is not None:
+                fila = self._conexion.execute("SELECT scores FROM scores WHERE clave = ?", (clave,)).fetchone()
+                if fila is not None:
+                    scores = json.loads(fila[0])
+                    self._recordar(clave, scores)
+            return scores
+
+    def guardar(self, clave, scores):
+        scores = {k: v for k, v in scores.items() if k != 'habitatId'}
+        with self._candado:
+            self._recordar(clave, scores)
+            if self._conexion is not None:
+                self._conexion.execute("INSERT OR REPLACE INTO scores VALUES (?, ?)", (clave, json.dumps(scores)))
+                self._pendientes += 1
+                if self._pendientes >= self.ESCRITURAS_POR_COMMIT:
+                    self._confirmar()
+
+    def _recordar(self, clave, scores):
+        self._memoria[clave] = scores
+        self._memoria.move_to_end(clave)
+        if len(self._memoria) > self.maxEntradas:
+            self._memoria.popitem(last=False)
+
+    def generarScores(self, habitatLayout, contextoMision, motor='python', modoVista='exacto', config=None):
+        """Como generarScoresHabitat, pero sólo calcula los layouts que no están en la caché."""
+        clave = claveScores(habitatLayout, contextoMision, modoVista, config)
+        scores = self.obtener(clave)
+        if scores is None:
+            self.fallos += 1
+            scores = generarScoresHabitat(habitatLayout, contextoMision, motor, modoVista, config)
+            self.guardar(clave, scores)
+        else:
+            self.aciertos += 1
+        return {'habitatId': habitatLayout.get('id', 'N/A'), **scores}
+
+    def confirmar(self):
+        """Escribe a disco las entradas pendientes."""
+        with self._candado:
+            self._confirmar()
+
+    def _confirmar(self):
+        if self._conexion is not None and self._pendientes:
+            self._conexion.commit()
+            self._pendientes = 0
+
+    def cerrar(self):
+        with self._candado:
+            if self._conexion is not None:
+                self._confirmar()
+                self._conexion.close()
+                self._conexion = None
+
+# --- 3.5 CELDAS COMPACTAS ---
+#
+# Un layout grande como lista de dicts cuesta dos dicts (celda y props) por
+# celda. Celda (con __slots__) y ColeccionCeldas (arreglos por columna, unos
+# 50 bytes por celda) son la representación compacta; el formato de dicts se
+# conserva en la E/S (JSON, Parquet, editor) con desdeDicts/aDicts. Sólo se
+# guardan los props de CAMPOS_PROPS y la huella ya rotada.
+
+CAMPOS_PROPS = ['masa', 'volumen', 'costo', 'limpieza', 'permanencia']
+
+# Valor de cada prop ausente para el motor numpy (mismos defaults que empaquetarCeldas)
+_PROPS_POR_DEFECTO = {'masa': 0.0, 'limpieza': -1.0, 'permanencia': 1}
+
+
+def _valorProp(campo, valor):
+    # permanencia es entera en los datos del proyecto; se regresa como int si lo es
+    if campo == 'permanencia' and float(valor).is_integer():
+        return int(valor)
+    return valor
+
+
+class Celda:
+    """Una celda compacta: posición, huella, código de tipo internado y props (None = ausente)."""
+    __slots__ = ('x', 'y', 'w', 'h', 'codigo', 'masa', 'volumen', 'costo', 'limpieza', 'permanencia')
+
+    def __init__(self, x, y, tipo, w=1, h=1, masa=None, volumen=None, costo=None, limpieza=None, permanencia=None):
+        self.x, self.y, self.w, self.h = x, y, w, h
+        self.codigo = _codigoTipo(tipo)
+        self.masa, self.volumen, self.costo = masa, volumen, costo
+        self.limpieza, self.permanencia = limpieza, permanencia
+
+    @property
+    def tipo(self):
+        return TIPOS_MODULO[self.codigo]
+
+    @classmethod
+    def desdeDict(cls, celda):
+        w, h = dimensionesHuella(celda)
+        props = celda.get('props', {})
+        return cls(celda['x'], celda['y'], celda['type'], w, h, **{
+            campo: props[campo] for campo in CAMPOS_PROPS if campo in props})
+
+    def props(self):
+        """Dict con los props presentes, como en el formato de dicts."""
+        return {campo: _valorProp(campo, getattr(self, campo))
+                for campo in CAMPOS_PROPS if getattr(self, campo) is not None}
+
+    def aDict(self):
+        celda = {'x': self.x, 'y': self.y, 'type': self.tipo, 'props': self.props()}
+        if (self.w, self.h) != (1, 1):
+            celda['w'], celda['h'] = self.w, self.h
+        return celda
+
+    def __repr__(self):
+        return f"Celda({self.x}, {self.y}, {self.tipo!r}, w={self.w}, h={self.h})"
+
+
+class ColeccionCeldas:
+    """
+    Celdas de un hábitat en arreglos por columna: x, y, w, h (int32), código de
+    tipo (int16) y un float64 por prop (NaN = ausente). Se puede pasar como
+    'cells' de un layout a generarScoresHabitat: el motor numpy usa los
+    arreglos directamente y el de referencia los convierte a dicts.
+    Iterarla produce objetos Celda.
+    """
+
+    def __init__(self, x, y, w, h, codigo, props):
+        self.x, self.y, self.w, self.h, self.codigo = x, y, w, h, codigo
+        self.props = props  # nombre del prop -> arreglo float64
+
+    @classmethod
+    def desdeDicts(cls, celdas):
+        celdas = celdas if isinstance(celdas, list) else list(celdas)
+        n = len(celdas)
+        huellas = np.array([dimensionesHuella(c) for c in celdas], dtype=np.int32).reshape(n, 2)
+        props = {campo: np.fromiter((c.get('props', {}).get(campo, np.nan) for c in celdas), dtype=np.float64, count=n)
+                 for campo in CAMPOS_PROPS}
+        return cls(np.fromiter((c['x'] for c in celdas), dtype=np.int32, count=n),
+                   np.fromiter((c['y'] for c in celdas), dtype=np.int32, count=n),
+                   huellas[:, 0].copy(), huellas[:, 1].copy(),
+                   np.fromiter((_codigoTipo(c['type']) for c in celdas), dtype=np.int16, count=n),
+                   props)
+
+    def __len__(self):
+        return len(self.x)
+
+    def __iter__(self):
+        columnas = [self.x, self.y, self.codigo, self.w, self.h] + [self.props[campo] for campo in CAMPOS_PROPS]
+        for x, y, codigo, w, h, *props in zip(*(columna.tolist() for columna in columnas)):
+            yield Celda(x, y, TIPOS_MODULO[codigo], w, h, *(None if p != p else p for p in props))
+
+    def __getitem__(self, i):
+        props = (self.props[campo][i].item() for campo in CAMPOS_PROPS)
+        return Celda(self.x[i].item(), self.y[i].item(), TIPOS_MODULO[self.codigo[i]],
+                     self.w[i].item(), self.h[i].item(), *(None if p != p else p for p in props))
+
+    def aDicts(self):
+        return [celda.aDict() for celda in self]
+
+    def empaquetar(self):
+        """Los mismos arreglos que empaquetarCeldas(self.aDicts()), sin pasar por dicts."""
+        x, y = self.x.astype(np.float64), self.y.astype(np.float64)
+        w, h = self.w.astype(np.int64), self.h.astype(np.int64)
+        arr = {'x': x, 'y': y, 'w': w, 'h': h, 'cx': x + (w - 1) / 2, 'cy': y + (h - 1) / 2,
+               'tipo': self.codigo.astype(np.int64)}
+        for campo, porDefecto in _PROPS_POR_DEFECTO.items():
+            valores = self.props[campo]
+            arr[campo] = np.where(np.isnan(valores), porDefecto, valores)
+        return arr
+
+    def memoria(self):
+        """Bytes ocupados por los arreglos."""
+        return sum(a.nbytes for a in (self.x, self.y, self.w, self.h, self.codigo, *self.props.values()))
 
 # --- 4. EJEMPLO DE USO ---
 
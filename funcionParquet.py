@@ -0,0 +1,155 @@
+import json
+import argparse
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from funcionJSON import COLUMNAS_SCORES, CAMPOS_PROPS, generarScoresLote, iterarLayoutsJsonl, _normalizarRegistro
+
+# --- 1. ESQUEMA ---
+#
+# Un hábitat por fila. Las celdas son una columna list<struct> y el tipo de
+# módulo va codificado como diccionario (se repite en millones de celdas), lo
+# mismo que el material del contexto. Los sub-scores son columnas planas
+# opcionales, de modo que leer sólo los scores no toca las celdas.
+
+TIPO_DICCIONARIO = pa.dictionary(pa.int8(), pa.string())
+
+TIPO_CELDA = pa.struct([
+    ('x', pa.int32()),
+    ('y', pa.int32()),
+    ('type', TIPO_DICCIONARIO),
+    ('props', pa.struct([(campo, pa.float64()) for campo in CAMPOS_PROPS])),
+    # Huella opcional (nula = 1x1 sin rotar), ver dimensionesHuella
+    ('w', pa.int16()),
+    ('h', pa.int16()),
+    ('rot', pa.int16()),
+])
+
+CAMPOS_HUELLA = ['w', 'h', 'rot']
+
+TIPO_CONTEXTO = pa.struct([
+    ('cantidadTripulacion', pa.int32()),
+    ('materialEstructural', TIPO_DICCIONARIO),
+    ('resistenciaRadiacion', pa.float64()),
+])
+
+COLUMNAS_SCORES_PARQUET = COLUMNAS_SCORES[1:] + ['calificacionExperto']
+
+ESQUEMA_LAYOUTS = pa.schema(
+    [('habitatId', pa.string()), ('cells', pa.list_(TIPO_CELDA)), ('contexto', TIPO_CONTEXTO)]
+    + [(columna, pa.float64()) for columna in COLUMNAS_SCORES_PARQUET]
+)
+
+# Filas por row group al escribir (y por lote al leer)
+FILAS_POR_GRUPO = 10000
+
+
+# --- 2. ESCRITURA ---
+
+def _tablaDeGrupo(layouts, contextos, scores):
+    """Construye la tabla Arrow de un grupo de hábitats."""
+    columnas = {
+        'habitatId': pa.array([layout.get('id', 'N/A') for layout in layouts], pa.string()),
+        'cells': pa.array([layout.get('cells', []) for layout in layouts], pa.list_(TIPO_CELDA)),
+        'contexto': pa.array(contextos, TIPO_CONTEXTO),
+    }
+    for columna in COLUMNAS_SCORES_PARQUET:
+        valores = [s.get(columna) if s else None for s in scores]
+        columnas[columna] = pa.array(valores, pa.float64())
+    return pa.table(columnas, schema=ESQUEMA_LAYOUTS)
+
+def escribirLayoutsParquet(path, registros, calcularScores=False, filasPorGrupo=FILAS_POR_GRUPO):
+    """
+    Escribe hábitats a Parquet por row groups, sin tener todo el dataset en
+    memoria. `registros` es un iterable de (layout, contexto) o de
+    (layout, contexto, scores), con `scores` un dict de sub-scores (p. ej. una
+    fila etiquetada con calificacionExperto). Con calcularScores=True los
+    sub-scores que falten se calculan con generarScoresLote.
+    Regresa la cantidad de hábitats escritos.
+    """
+    total = 0
+    with pq.ParquetWriter(path, ESQUEMA_LAYOUTS) as escritor:
+        grupo = []
+        for registro in registros:
+            grupo.append(registro)
+            if len(grupo) >= filasPorGrupo:
+                escritor.write_table(_prepararGrupo(grupo, calcularScores))
+                total += len(grupo)
+                grupo = []
+        if grupo:
+            escritor.write_table(_prepararGrupo(grupo, calcularScores))
+            total += len(grupo)
+    return total
+
+def _prepararGrupo(grupo, calcularScores):
+    layouts = [r[0] for r in grupo]
+    contextos = [r[1] for r in grupo]
+    scores = [r[2] if len(r) > 2 else None for r in grupo]
+    if calcularScores:
+        calculados = generarScoresLote(layouts, contextos).to_dict('records')
+        scores = [{**c, **(s or {})} for c, s in zip(calculados, scores)]
+    return _tablaDeGrupo(layouts, contextos, scores)
+
+
+# --- 3. LECTURA ---
+
+def _celdaDesdeArrow(celda):
+    # Los props y campos de huella nulos son campos que no venían en el JSON original
+    celda['props'] = {k: v for k, v in celda['props'].items() if v is not None}
+    for campo in CAMPOS_HUELLA:
+        if celda[campo] is None:
+            del celda[campo]
+    return celda
+
+def iterarLayoutsParquet(path, lineaInicial=0):
+    """
+    Produce (fila, layout, contexto) leyendo el archivo por lotes (memoria
+    acotada), empezando en la fila `lineaInicial`. Mismo contrato que
+    iterarLayoutsJsonl.
+    """
+    archivo = pq.ParquetFile(path, memory_map=True)
+    fila = 0
+    for lote in archivo.iter_batches(batch_size=FILAS_POR_GRUPO, columns=['habitatId', 'cells', 'contexto']):
+        if fila + lote.num_rows <= lineaInicial:
+            fila += lote.num_rows
+            continue
+        for registro in lote.to_pylist():
+            if fila >= lineaInicial:
+                layout = {'id': registro['habitatId'], 'cells': [_celdaDesdeArrow(c) for c in registro['cells']]}
+                contexto = {k: v for k, v in registro['contexto'].items() if v is not None}
+                yield fila, layout, contexto
+            fila += 1
+
+def leerScoresParquet(path, columnas=None):
+    """
+    Lee la tabla de scores (habitatId y sub-scores, sin las celdas) como
+    DataFrame, con el archivo mapeado en memoria. Las columnas de score sin
+    ningún valor se omiten.
+    """
+    columnas = columnas or ['habitatId'] + COLUMNAS_SCORES_PARQUET
+    tabla = pq.read_table(path, columns=columnas, memory_map=True)
+    vacias = [nombre for nombre in tabla.column_names if tabla.column(nombre).null_count == len(tabla) > 0]
+    return tabla.drop_columns(vacias).to_pandas()
+
+
+# --- 4. CONVERSIÓN DESDE JSON / JSONL ---
+
+def _iterarRegistrosJson(path):
+    if str(path).endswith('.jsonl'):
+        for _, layout, contexto in iterarLayoutsJsonl(path):
+            yield layout, contexto
+        return
+    with open(path, 'r') as f:
+        datos = json.load(f)
+    for registro in (datos if isinstance(datos, list) else [datos]):
+        yield _normalizarRegistro(registro)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convierte layouts .json/.jsonl a Parquet.")
+    parser.add_argument('entrada', help="Archivo .json o .jsonl de layouts")
+    parser.add_argument('salida', help="Archivo .parquet de salida")
+    parser.add_argument('--scores', action='store_true', help="Calcular y guardar también los sub-scores")
+    args = parser.parse_args()
+
+    total = escribirLayoutsParquet(args.salida, _iterarRegistrosJson(args.entrada), args.scores)
+    print(f"{total} hábitats guardados en '{args.salida}'")
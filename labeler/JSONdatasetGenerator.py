@@ -1,6 +1,8 @@
 import json
 import random
+import argparse
 from pathlib import Path
+from multiprocessing import Pool
 
 # --- CONFIGURACIÓN ---
 
@@ -44,11 +46,11 @@ PERMANENCIA_RULES = {
 }
 
 
-def generate_props(module_type: str) -> dict:
+def generate_props(module_type: str, rng=random) -> dict:
     """Genera el diccionario 'props' para un tipo de módulo específico."""
     # Elige un volumen aleatorio de la lista de opciones para ese tipo de módulo
     possible_volumes = VOLUME_OPTIONS.get(module_type, [0.0]) # Devuelve [0.0] si el módulo no está en la lista
-    random_volume = random.choice(possible_volumes)
+    random_volume = rng.choice(possible_volumes)
     
     return {
         "masa": 0.0,
@@ -61,38 +63,39 @@ def generate_props(module_type: str) -> dict:
 # Temporalmente reducido a 50x50 para el labeler
 # para que funcione en terminal
 # Revisar si cambiar a 100x100 luego
-def generate_cell(module_type: str) -> dict:
+def generate_cell(module_type: str, rng=random) -> dict:
     """Crea un único diccionario de celda con coordenadas aleatorias."""
     return {
-        "x": random.randint(0, 50),
-        "y": random.randint(0, 50),
+        "x": rng.randint(0, 50),
+        "y": rng.randint(0, 50),
         "type": module_type,
-        "props": generate_props(module_type)
+        "props": generate_props(module_type, rng)
     }
 
-def generate_habitat_layout(layout_id: int) -> dict:
-    """Genera un layout de hábitat completo con su contexto y celdas."""
+def generate_habitat_layout(layout_id: int, rng=random) -> dict:
+    """Genera un layout de hábitat completo con su contexto y celdas.
+    `rng` es el generador a usar (por defecto el global de `random`)."""
     
     # 1. Generar el contexto aleatoriamente
-    crew_size = random.randint(2, 8)
+    crew_size = rng.randint(2, 8)
     contexto = {
         "cantidadTripulacion": crew_size,
-        "materialEstructural": random.choice(STRUCTURAL_MATERIALS),
-        "resistenciaRadiacion": random.randint(3, 10)
+        "materialEstructural": rng.choice(STRUCTURAL_MATERIALS),
+        "resistenciaRadiacion": rng.randint(3, 10)
     }
     
     # 2. Generar las celdas
     cells = []
     
     # Regla 1: Asegurar que haya igual o más módulos PRIVATE que tripulación
-    num_private_modules = random.randint(crew_size, crew_size + 2)
+    num_private_modules = rng.randint(crew_size, crew_size + 2)
     for _ in range(num_private_modules):
-        cells.append(generate_cell("PRIVATE"))
+        cells.append(generate_cell("PRIVATE", rng))
         
     # Regla 2: Asegurar que haya por lo menos uno de CADA OTRO tipo de módulo
     other_modules = [mtype for mtype in MODULE_TYPES if mtype != "PRIVATE"]
     for module_type in other_modules:
-        cells.append(generate_cell(module_type))
+        cells.append(generate_cell(module_type, rng))
         
     # 3. Ensamblar la estructura final del layout
     layout_data = {
@@ -106,18 +109,99 @@ def generate_habitat_layout(layout_id: int) -> dict:
     return layout_data
 
 
+# --- GENERACIÓN POR SHARDS (MULTIPROCESO) ---
+
+def shard_seeds(master_seed: int, num_shards: int) -> list:
+    """Deriva una semilla por shard a partir de la semilla maestra.
+    El dataset depende sólo de (master_seed, num_shards), no del número de procesos."""
+    master = random.Random(master_seed)
+    return [master.getrandbits(64) for _ in range(num_shards)]
+
+def shard_path(output_dir: Path, shard_index: int, fmt: str = "json") -> Path:
+    return Path(output_dir) / f"shard_{shard_index:05d}.{fmt}"
+
+def write_layouts(f, layouts, fmt: str = "json") -> int:
+    """Escribe los layouts de un iterable a medida que se producen, sin tenerlos
+    todos en memoria: como lista JSON ("json") o uno por línea ("jsonl").
+    Regresa la cantidad escrita."""
+    count = 0
+    if fmt == "jsonl":
+        for layout in layouts:
+            f.write(json.dumps(layout, ensure_ascii=False) + "\n")
+            count += 1
+        return count
+    f.write("[\n")
+    for layout in layouts:
+        if count:
+            f.write(",\n")
+        json.dump(layout, f, indent=2, ensure_ascii=False)
+        count += 1
+    f.write("\n]\n")
+    return count
+
+def generate_shard(task: tuple) -> tuple:
+    """Genera un shard completo y lo escribe layout por layout, sin tener todo
+    el shard en memoria. Regresa (ruta, cantidad)."""
+    shard_index, first_id, count, seed, output_dir, fmt = task
+    rng = random.Random(seed)
+    path = shard_path(output_dir, shard_index, fmt)
+    with path.open("w", encoding="utf-8") as f:
+        write_layouts(f, (generate_habitat_layout(first_id + n, rng) for n in range(count)), fmt)
+    return path, count
+
+def generate_dataset_sharded(num_layouts: int, num_shards: int, output_dir, master_seed: int, processes=None,
+                             fmt: str = "json") -> list:
+    """Reparte num_layouts en num_shards archivos generados en paralelo.
+    Los ids de layout son globales y consecutivos entre shards."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    base, extra = divmod(num_layouts, num_shards)
+    tasks, first_id = [], 0
+    for shard_index, seed in enumerate(shard_seeds(master_seed, num_shards)):
+        count = base + (1 if shard_index < extra else 0)
+        tasks.append((shard_index, first_id, count, seed, output_dir, fmt))
+        first_id += count
+
+    with Pool(processes) as pool:
+        results = []
+        for path, count in pool.imap_unordered(generate_shard, tasks):
+            print(f"  {path} ({count} layouts)")
+            results.append(path)
+    return sorted(results)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera layouts de hábitat aleatorios para el dataset.")
+    parser.add_argument("--num-layouts", type=int, default=100, help="Cantidad de layouts a generar")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="Si es > 0, genera en paralelo y escribe un archivo por shard en --output-dir")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla maestra (reproducible)")
+    parser.add_argument("--processes", type=int, default=None, help="Procesos del pool (por defecto, uno por CPU)")
+    parser.add_argument("--format", choices=["json", "jsonl"], default="json",
+                        help="Lista JSON o JSON Lines (un layout por línea)")
+    parser.add_argument("--output", default=None,
+                        help="Archivo de salida (modo sin shards; por defecto training_layouts_v2.<format>)")
+    parser.add_argument("--output-dir", default="training_layouts_shards", help="Directorio de salida (modo con shards)")
+    args = parser.parse_args()
+
     # Cantidad de layouts que quieres generar para tu dataset
-    NUM_LAYOUTS_TO_GENERATE = 100
+    NUM_LAYOUTS_TO_GENERATE = args.num_layouts
     
     print(f"Generando {NUM_LAYOUTS_TO_GENERATE} layouts...")
-    
-    # Crear la lista de todos los layouts
-    all_layouts = [generate_habitat_layout(i) for i in range(NUM_LAYOUTS_TO_GENERATE)]
-    
-    # Guardar la lista completa en un archivo JSON
-    output_path = Path("training_layouts_v2.json")
-    with output_path.open("w", encoding="utf-8") as f:
-        json.dump(all_layouts, f, indent=2, ensure_ascii=False)
-        
-    print(f" ¡Éxito! Se ha guardado el dataset en el archivo: {output_path}")
\ No newline at end of file
+
+    if args.shards > 0:
+        master_seed = args.seed if args.seed is not None else random.getrandbits(64)
+        paths = generate_dataset_sharded(NUM_LAYOUTS_TO_GENERATE, args.shards, args.output_dir,
+                                         master_seed, args.processes, args.format)
+        print(f" ¡Éxito! Se guardaron {len(paths)} shards en '{args.output_dir}' (semilla maestra {master_seed})")
+    else:
+        if args.seed is not None:
+            random.seed(args.seed)
+
+        # Generar y guardar los layouts uno por uno
+        all_layouts = (generate_habitat_layout(i) for i in range(NUM_LAYOUTS_TO_GENERATE))
+        output_path = Path(args.output or f"training_layouts_v2.{args.format}")
+        with output_path.open("w", encoding="utf-8") as f:
+            write_layouts(f, all_layouts, args.format)
+            
+        print(f" ¡Éxito! Se ha guardado el dataset en el archivo: {output_path}")
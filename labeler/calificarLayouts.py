@@ -0,0 +1,159 @@
+import csv
+import time
+import argparse
+from pathlib import Path
+from collections import deque
+from multiprocessing import Pool
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from funcionJSON import (generarScoresHabitat, calcularCalificacionFinal, claveScores, CacheScores,
+                         COLUMNAS_SCORES, MODOS_VISTA)
+from dataLabeler import iterarRegistros
+
+# Calificación no interactiva de archivos de layouts (.json, .jsonl o .parquet):
+# reparte generarScoresHabitat + calcularCalificacionFinal en un pool de
+# procesos y escribe la tabla de scores (.csv o .parquet) a medida que llegan
+# los resultados, en el mismo orden que la entrada. Con una caché de scores
+# (--cache), los layouts ya calificados no se vuelven a calcular.
+
+COLUMNAS_SALIDA = COLUMNAS_SCORES + ['calificacionFinal']
+
+# Filas acumuladas antes de escribir un row group en la salida Parquet
+FILAS_POR_GRUPO = 10000
+
+_opciones = {'motor': 'python', 'modoVista': 'exacto'}
+
+def _inicializarWorker(motor, modoVista):
+    _opciones['motor'] = motor
+    _opciones['modoVista'] = modoVista
+
+def calificarLayout(registro):
+    """
+    Regresa la fila de scores (con calificacionFinal) de un (layout, contexto)
+    o de un (layout, contexto, scores) con sub-scores ya tomados de la caché.
+    """
+    layout, contexto = registro[0], registro[1]
+    if len(registro) > 2:
+        scores = {'habitatId': layout.get('id', 'N/A'), **registro[2]}
+    else:
+        scores = generarScoresHabitat(layout, contexto, motor=_opciones['motor'], modoVista=_opciones['modoVista'])
+    scores['calificacionFinal'] = calcularCalificacionFinal(scores)
+    return scores
+
+
+def _consultarCache(registros, cache, modoVista, pendientes):
+    """
+    Pasa los registros al pool, sustituyendo los que ya están en la caché por
+    (layout sólo con id, contexto, scores). Por cada registro agrega a
+    `pendientes` la llave que hay que guardar al recibir su resultado (o None).
+    """
+    for layout, contexto in registros:
+        clave = claveScores(layout, contexto, modoVista)
+        scores = cache.obtener(clave)
+        if scores is None:
+            pendientes.append(clave)
+            yield layout, contexto
+        else:
+            pendientes.append(None)
+            yield {'id': layout.get('id', 'N/A')}, contexto, scores
+
+
+class _SalidaCsv:
+    def __init__(self, path):
+        self._archivo = open(path, 'w', newline='')
+        self._escritor = csv.DictWriter(self._archivo, fieldnames=COLUMNAS_SALIDA, extrasaction='ignore')
+        self._escritor.writeheader()
+
+    def escribir(self, fila):
+        self._escritor.writerow(fila)
+
+    def cerrar(self):
+        self._archivo.close()
+
+
+class _SalidaParquet:
+    ESQUEMA = pa.schema([('habitatId', pa.string())] + [(c, pa.float64()) for c in COLUMNAS_SALIDA[1:]])
+
+    def __init__(self, path):
+        self._escritor = pq.ParquetWriter(path, self.ESQUEMA)
+        self._filas = []
+
+    def escribir(self, fila):
+        self._filas.append(fila)
+        if len(self._filas) >= FILAS_POR_GRUPO:
+            self._vaciar()
+
+    def _vaciar(self):
+        if self._filas:
+            filas = [{c: f.get(c) for c in COLUMNAS_SALIDA} for f in self._filas]
+            self._escritor.write_table(pa.Table.from_pylist(filas, schema=self.ESQUEMA))
+            self._filas = []
+
+    def cerrar(self):
+        self._vaciar()
+        self._escritor.close()
+
+
+def _escribirResultados(resultados, salida, cache, pendientes):
+    """Escribe las filas en orden y guarda en la caché las que se calcularon. Regresa cuántas fueron."""
+    cantidad = 0
+    for fila in resultados:
+        salida.escribir(fila)
+        cantidad += 1
+        clave = pendientes.popleft() if cache is not None else None
+        if clave is not None:
+            cache.guardar(clave, {k: v for k, v in fila.items() if k != 'calificacionFinal'})
+    return cantidad
+
+
+def calificarArchivo(archivoEntrada, archivoSalida, procesos=None, tamanoChunk=64, motor='python', modoVista='exacto',
+                     pathCache=None):
+    """
+    Califica todos los layouts de `archivoEntrada` y escribe la tabla de scores
+    en `archivoSalida` (.parquet o, en cualquier otro caso, CSV).
+    Con procesos=1 se califica en el proceso actual. Con `pathCache` (SQLite)
+    los sub-scores se consultan y guardan en una CacheScores; sólo el proceso
+    principal la usa. Regresa (cantidad, segundos).
+    """
+    salida = _SalidaParquet(archivoSalida) if str(archivoSalida).endswith('.parquet') else _SalidaCsv(archivoSalida)
+    registros = ((layout, contexto) for _, layout, contexto in iterarRegistros(str(archivoEntrada)))
+    cache = CacheScores(pathDisco=pathCache) if pathCache else None
+    pendientes = deque()
+    if cache is not None:
+        registros = _consultarCache(registros, cache, modoVista, pendientes)
+    inicio = time.perf_counter()
+    try:
+        if procesos == 1:
+            _inicializarWorker(motor, modoVista)
+            cantidad = _escribirResultados(map(calificarLayout, registros), salida, cache, pendientes)
+        else:
+            with Pool(procesos, initializer=_inicializarWorker, initargs=(motor, modoVista)) as pool:
+                resultados = pool.imap(calificarLayout, registros, chunksize=tamanoChunk)
+                cantidad = _escribirResultados(resultados, salida, cache, pendientes)
+    finally:
+        salida.cerrar()
+        if cache is not None:
+            cache.cerrar()
+    return cantidad, time.perf_counter() - inicio
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Califica un archivo de layouts sin intervención manual.")
+    parser.add_argument('entrada', help="Archivo .json, .jsonl o .parquet de layouts")
+    parser.add_argument('salida', nargs='?', default=None,
+                        help="Tabla de scores .csv o .parquet (por defecto <entrada>_scores.csv)")
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos del pool (por defecto, uno por CPU)")
+    parser.add_argument('--chunksize', type=int, default=64, help="Layouts por tarea enviada a cada proceso")
+    parser.add_argument('--motor', choices=['python', 'numpy'], default='python')
+    parser.add_argument('--modo-vista', choices=MODOS_VISTA, default='exacto')
+    parser.add_argument('--cache', default=None, help="Archivo SQLite de caché de scores (se crea si no existe)")
+    args = parser.parse_args()
+
+    entrada = Path(args.entrada)
+    salida = args.salida or str(entrada.with_name(entrada.stem + '_scores.csv'))
+    cantidad, segundos = calificarArchivo(entrada, salida, args.procesos, args.chunksize, args.motor, args.modo_vista,
+                                          args.cache)
+    print(f"{cantidad} layouts calificados en {segundos:.2f} s "
+          f"({cantidad / segundos if segundos else 0:.1f} layouts/s) -> '{salida}'")
@@ -1,7 +1,11 @@
+import os
+import csv
 import math
-import pandas as pd
+import argparse
 import json
-from funcionJSON import generarScoresHabitat
+from funcionJSON import (generarScoresHabitat, calcularScoreVistaEspacial, iterarLayoutsJsonl, COLUMNAS_SCORES,
+                         MODOS_VISTA)
+from funcionParquet import iterarLayoutsParquet, escribirLayoutsParquet
 
 MAPA_VISUAL = {
     'PRIVATE': '[P]', 'HYGIENE': '[H]', 'WASTE': '[W]', 'EXERCISE': '[E]',
@@ -28,24 +32,123 @@ def visualizarLayoutEnTerminal(celdas, width, height):
         print("|" + "".join(row) + "|")
     print("+" + "---" * width + "+")
 
-def etiquetarDatos(archivoJsonEntrada, archivoCsvSalida):
+COLUMNAS_CSV = COLUMNAS_SCORES + ['calificacionExperto']
+
+def iterarRegistros(archivoJsonEntrada, lineaInicial=0):
+    """
+    Produce (indice, layout, contexto) desde `lineaInicial`. Los .jsonl y
+    .parquet se leen por partes (memoria acotada); los .json se cargan completos.
+    """
+    if archivoJsonEntrada.endswith('.jsonl'):
+        yield from iterarLayoutsJsonl(archivoJsonEntrada, lineaInicial)
+        return
+    if archivoJsonEntrada.endswith('.parquet'):
+        yield from iterarLayoutsParquet(archivoJsonEntrada, lineaInicial)
+        return
+    with open(archivoJsonEntrada, 'r') as f:
+        datosParaEtiquetar = json.load(f)
+    for i in range(lineaInicial, len(datosParaEtiquetar)):
+        yield i, datosParaEtiquetar[i]['layout'], datosParaEtiquetar[i]['contexto']
+
+def ultimaFilaCsv(archivoCsv):
+    """Última fila de datos de un CSV como dict; None si no existe o no tiene filas."""
+    if not os.path.exists(archivoCsv):
+        return None
+    ultima = None
+    with open(archivoCsv, 'r', newline='') as f:
+        for fila in csv.DictReader(f):
+            ultima = fila
+    return ultima
+
+def registroSiguienteA(archivoJsonEntrada, habitatId):
+    """
+    Regresa (indice, layout): el índice (el que recibe iterarRegistros como
+    lineaInicial) del registro que sigue al hábitat `habitatId` en la entrada
+    y el layout de ese hábitat. Lanza ValueError si no está.
+    """
+    for i, layout, _ in iterarRegistros(archivoJsonEntrada):
+        if layout.get('id', 'N/A') == habitatId:
+            return i + 1, layout
+    raise ValueError(f"El hábitat '{habitatId}' del CSV no está en '{archivoJsonEntrada}'")
+
+def verificarModoVista(layout, fila, modoVista):
+    """
+    Lanza ValueError si el scoreVistaEspacial guardado en `fila` no es el que
+    da `modoVista` para `layout`, para no mezclar las dos métricas de vista en
+    una misma columna del CSV.
+    """
+    guardado = float(fila['scoreVistaEspacial'])
+    modos = [m for m in MODOS_VISTA
+             if math.isclose(calcularScoreVistaEspacial(layout['cells'], m)['scoreVistaEspacial'], guardado)]
+    if modoVista not in modos:
+        sugerencia = f"usa modoVista='{modos[0]}'" if modos else "se calculó con otra versión del scoring"
+        raise ValueError(f"La última fila del CSV ('{fila['habitatId']}') no se calculó con "
+                         f"modoVista='{modoVista}': {sugerencia} o empieza un CSV nuevo")
+
+def exportarParquet(archivoJsonEntrada, archivoCsv, archivoParquet):
+    """
+    Guarda los hábitats etiquetados (celdas, contexto, sub-scores y
+    calificacionExperto) en Parquet. Cada fila del CSV se une por habitatId
+    con su registro de la entrada, así que el CSV puede empezar en cualquier
+    registro. Lanza ValueError si un habitatId se repite en el CSV o no está
+    en la entrada.
+    """
+    filasPorId = {}
+    with open(archivoCsv, 'r', newline='') as f:
+        for fila in csv.DictReader(f):
+            if fila['habitatId'] in filasPorId:
+                raise ValueError(f"El hábitat '{fila['habitatId']}' aparece más de una vez en '{archivoCsv}'")
+            for columna in COLUMNAS_CSV[1:]:
+                fila[columna] = float(fila[columna]) if fila.get(columna) not in (None, '') else None
+            filasPorId[fila['habitatId']] = fila
+    total = escribirLayoutsParquet(archivoParquet, _registrosEtiquetados(archivoJsonEntrada, filasPorId))
+    print(f"{total} hábitats etiquetados guardados en '{archivoParquet}'")
+
+def _registrosEtiquetados(archivoJsonEntrada, filasPorId):
+    """(layout, contexto, fila) de los registros de la entrada que tienen fila en el CSV."""
+    for _, layout, contexto in iterarRegistros(archivoJsonEntrada):
+        if not filasPorId:
+            return
+        fila = filasPorId.pop(layout.get('id', 'N/A'), None)
+        if fila is not None:
+            yield layout, contexto, fila
+    if filasPorId:
+        raise ValueError(f"Hábitats del CSV que no están en '{archivoJsonEntrada}': {', '.join(filasPorId)}")
+
+def etiquetarDatos(archivoJsonEntrada, archivoCsvSalida, lineaInicial=0, reanudar=False, modoVista='exacto'):
     """
     Herramienta principal para el etiquetado de datos.
+
+    Cada hábitat etiquetado se agrega al CSV en cuanto se califica. Con
+    reanudar=True se continúa un CSV existente a partir del registro que sigue
+    al habitatId de la última fila guardada (sin importar en qué registro
+    empezó el CSV); si no, o si el CSV no tiene filas, se empieza en
+    `lineaInicial` con un CSV nuevo.
+
+    `modoVista` es el de generarScoresHabitat. Al reanudar se verifica que la
+    última fila se haya calculado con el mismo modo (ver verificarModoVista).
+    training/dataset_etiquetado.csv y modelo_lars.pkl usan 'muestreado', la
+    métrica anterior: para extenderlos hay que etiquetar con ese modo.
     """
-    try:
-        with open(archivoJsonEntrada, 'r') as f:
-            datosParaEtiquetar = json.load(f)
-    except FileNotFoundError:
+    if not os.path.exists(archivoJsonEntrada):
         print(f"Error: No se encontró el archivo de entrada '{archivoJsonEntrada}'")
         return
 
-    datosEtiquetados = []
+    ultimaFila = ultimaFilaCsv(archivoCsvSalida) if reanudar else None
+    ultimoId = ultimaFila['habitatId'] if ultimaFila else None
+    if ultimoId is not None:
+        lineaInicial, ultimoLayout = registroSiguienteA(archivoJsonEntrada, ultimoId)
+        verificarModoVista(ultimoLayout, ultimaFila, modoVista)
+    salida = open(archivoCsvSalida, 'a' if ultimoId is not None else 'w', newline='')
+    escritor = csv.DictWriter(salida, fieldnames=COLUMNAS_CSV, extrasaction='ignore')
+    if ultimoId is None:
+        escritor.writeheader()
 
     print("--- INICIO DEL PROCESO DE ETIQUETADO ---")
+    if lineaInicial:
+        print(f"Reanudando desde el registro {lineaInicial}")
 
-    for i, data in enumerate(datosParaEtiquetar):
-        layout = data['layout']
-        contexto = data['contexto']
+    for i, layout, contexto in iterarRegistros(archivoJsonEntrada, lineaInicial):
         habitatId = layout.get('id', f'habitat_{i+1}')
         celdas = layout.get('cells', [])
         
@@ -65,7 +168,7 @@ def etiquetarDatos(archivoJsonEntrada, archivoCsvSalida):
 
         #Lista de scores
         # Calcular los scores automáticos
-        scoresCalculados = generarScoresHabitat(layout, contexto)
+        scoresCalculados = generarScoresHabitat(layout, contexto, modoVista=modoVista)
         print("Scores calculados automáticamente:")
         for key, value in scoresCalculados.items():
             if key != 'calificacionExperto':  # Evitar mostrar la calificación del experto aquí
@@ -85,15 +188,27 @@ def etiquetarDatos(archivoJsonEntrada, archivoCsvSalida):
         # Añadir la calificación del experto (normalizada de 0 a 1)
         scoresCalculados['calificacionExperto'] = calificacionExperto / 100.0
         
-        datosEtiquetados.append(scoresCalculados)
+        # Guardar de inmediato para poder reanudar si se interrumpe
+        escritor.writerow(scoresCalculados)
+        salida.flush()
         print(f"'{habitatId}' etiquetado con un score de {calificacionExperto}.")
 
-    # Exportar a CSV
-    df = pd.DataFrame(datosEtiquetados)
-    df.to_csv(archivoCsvSalida, index=False)
+    salida.close()
     print(f"\n Proceso completado. Dataset guardado en '{archivoCsvSalida}'")
 
 if __name__ == '__main__':
-    archivoJsonEntrada = 'training_layouts_v2.json'
-    archivoCsvSalida = 'dataset_etiquetado.csv'
-    etiquetarDatos(archivoJsonEntrada, archivoCsvSalida)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Etiquetado manual de layouts de hábitat.")
+    parser.add_argument('entrada', nargs='?', default='training_layouts_v2.json',
+                        help="Archivo .json, .jsonl o .parquet de layouts")
+    parser.add_argument('salida', nargs='?', default='dataset_etiquetado.csv', help="CSV de salida")
+    parser.add_argument('--linea-inicial', type=int, default=0, help="Registro desde el cual empezar")
+    parser.add_argument('--reanudar', action='store_true', help="Continuar un CSV existente")
+    parser.add_argument('--modo-vista', choices=MODOS_VISTA, default='exacto',
+                        help="Métrica de scoreVistaEspacial "
+                             "('muestreado' para extender training/dataset_etiquetado.csv)")
+    parser.add_argument('--parquet', default=None,
+                        help="Al terminar, guardar también el dataset etiquetado (con celdas) en este .parquet")
+    args = parser.parse_args()
+    etiquetarDatos(args.entrada, args.salida, args.linea_inicial, args.reanudar, args.modo_vista)
+    if args.parquet:
+        exportarParquet(args.entrada, args.salida, args.parquet)
\ No newline at end of file
@@ -0,0 +1,183 @@
+import math
+import json
+import time
+import random
+from multiprocessing import Pool, cpu_count
+
+from funcionJSON import ConfiguracionScoring, EvaluadorIncremental, generarScoresHabitat, calcularCalificacionFinal
+from labeler.JSONdatasetGenerator import MODULE_TYPES, VOLUME_OPTIONS, LIMPIEZA_RULES, PERMANENCIA_RULES
+
+# --- 1. CONFIGURACIÓN ---
+
+# Temperatura del recocido en puntos de calificación (escala 0-100). Baja de
+# forma geométrica de la inicial a la final a lo largo del presupuesto de tiempo.
+TEMPERATURA_INICIAL = 5.0
+TEMPERATURA_FINAL = 0.01
+
+# Fracción de movimientos que intercambian la posición de dos celdas
+# (el resto mueve una celda a un tile libre cercano).
+PROB_INTERCAMBIO = 0.3
+INTENTOS_POSICION_LIBRE = 20
+
+
+# --- 2. LAYOUT INICIAL ---
+
+def generarCelda(tipo, x, y, rng):
+    """Crea una celda con las mismas reglas de props que JSONdatasetGenerator."""
+    return {
+        "x": x,
+        "y": y,
+        "type": tipo,
+        "props": {
+            "masa": 0.0,
+            "volumen": rng.choice(VOLUME_OPTIONS.get(tipo, [0.0])),
+            "costo": 0.0,
+            "limpieza": LIMPIEZA_RULES.get(tipo, 0.0),
+            "permanencia": PERMANENCIA_RULES.get(tipo, 0)
+        }
+    }
+
+def generarLayoutInicial(contextoMision, ancho, alto, rng):
+    """
+    Celdas en posiciones aleatorias distintas dentro de ancho x alto: un
+    PRIVATE por tripulante y uno de cada otro tipo de módulo, para que el
+    checklist se cumpla desde el inicio.
+    """
+    tripulacion = contextoMision.get('cantidadTripulacion', 4)
+    tipos = ['PRIVATE'] * tripulacion + [tipo for tipo in MODULE_TYPES if tipo != 'PRIVATE']
+    if len(tipos) > ancho * alto:
+        raise ValueError(f"No caben {len(tipos)} módulos en un área de {ancho}x{alto}")
+    posiciones = rng.sample(range(ancho * alto), len(tipos))
+    return [generarCelda(tipo, p % ancho, p // ancho, rng) for tipo, p in zip(tipos, posiciones)]
+
+
+# --- 3. RECOCIDO SIMULADO ---
+
+def _proponerMovimiento(celdas, ocupadas, ancho, alto, radio, rng):
+    """Regresa una lista de (indice, x, y) con las nuevas posiciones, o [] si no hay movimiento."""
+    if rng.random() < PROB_INTERCAMBIO:
+        a, b = rng.sample(range(len(celdas)), 2)
+        if celdas[a]['type'] == celdas[b]['type']:
+            return []
+        return [(a, celdas[b]['x'], celdas[b]['y']), (b, celdas[a]['x'], celdas[a]['y'])]
+
+    n = rng.randrange(len(celdas))
+    x, y = celdas[n]['x'], celdas[n]['y']
+    for _ in range(INTENTOS_POSICION_LIBRE):
+        nx = min(max(x + rng.randint(-radio, radio), 0), ancho - 1)
+        ny = min(max(y + rng.randint(-radio, radio), 0), alto - 1)
+        if (nx, ny) not in ocupadas:
+            return [(n, nx, ny)]
+    return []
+
+def _aplicarMovimiento(movimiento, celdas, ocupadas, evaluador):
+    """Mueve las celdas indicadas y regresa el movimiento inverso."""
+    inverso = [(n, celdas[n]['x'], celdas[n]['y']) for n, _, _ in movimiento]
+    for n, _, _ in movimiento:
+        del ocupadas[(celdas[n]['x'], celdas[n]['y'])]
+    for n, x, y in movimiento:
+        celdas[n] = dict(celdas[n], x=x, y=y)
+        ocupadas[(x, y)] = n
+        evaluador.agregarCelda(n, celdas[n])
+    return inverso
+
+def _recocidoSimulado(tarea):
+    """
+    Un reinicio completo: layout inicial aleatorio y recocido simulado hasta
+    agotar `segundos`. Cada movimiento se evalúa con EvaluadorIncremental, así
+    que sólo se recalcula lo que cambia. Regresa (calificacion, celdas, iteraciones).
+    """
+    contextoMision, ancho, alto, segundos, semilla, config = tarea
+    rng = random.Random(semilla)
+    celdas = generarLayoutInicial(contextoMision, ancho, alto, rng)
+    ocupadas = {(c['x'], c['y']): n for n, c in enumerate(celdas)}
+    evaluador = EvaluadorIncremental(contextoMision, enumerate(celdas), config=config)
+
+    actual = evaluador.calificacion()
+    mejor, mejoresCeldas = actual, evaluador.celdas()
+    iteraciones = 0
+    inicio = time.perf_counter()
+    while True:
+        progreso = (time.perf_counter() - inicio) / segundos
+        if progreso >= 1:
+            break
+        temperatura = TEMPERATURA_INICIAL * (TEMPERATURA_FINAL / TEMPERATURA_INICIAL) ** progreso
+        # Movimientos largos al principio, locales al final
+        radio = max(1, round(max(ancho, alto) * (1 - progreso)))
+
+        movimiento = _proponerMovimiento(celdas, ocupadas, ancho, alto, radio, rng)
+        if not movimiento:
+            continue
+        iteraciones += 1
+        inverso = _aplicarMovimiento(movimiento, celdas, ocupadas, evaluador)
+        nuevo = evaluador.calificacion()
+
+        if nuevo >= actual or rng.random() < math.exp((nuevo - actual) / temperatura):
+            actual = nuevo
+            if actual > mejor:
+                mejor, mejoresCeldas = actual, evaluador.celdas()
+        else:
+            _aplicarMovimiento(inverso, celdas, ocupadas, evaluador)
+
+    return mejor, mejoresCeldas, iteraciones
+
+def optimizarLayout(contextoMision, ancho=None, alto=None,
+                    presupuestoSegundos=10.0, reinicios=None, procesos=None, semilla=None, config=None):
+    """
+    Busca el layout con mayor calificacionFinal para `contextoMision` dentro
+    de un área de ancho x alto tiles (a partir de la esquina 0,0 del hábitat).
+    El hábitat y las ponderaciones son los de `config` (ConfiguracionScoring,
+    por defecto la de los globales); sin ancho/alto se usa el hábitat completo.
+
+    Lanza `reinicios` recocidos independientes (por defecto uno por proceso)
+    repartidos en un Pool de `procesos`; el presupuesto de tiempo total se
+    respeta aunque haya más reinicios que procesos. Con la misma `semilla` y
+    los mismos tiempos, los layouts iniciales son reproducibles.
+
+    Regresa {'layout': {'id', 'cells'}, 'contexto', 'scores',
+    'calificacionFinal', 'iteraciones'}, con los scores recalculados por
+    generarScoresHabitat.
+    """
+    config = config or ConfiguracionScoring()
+    ancho = config.ancho if ancho is None else ancho
+    alto = config.alto if alto is None else alto
+    if not (0 < ancho <= config.ancho and 0 < alto <= config.alto):
+        raise ValueError(f"El área debe caber en el hábitat de {config.ancho}x{config.alto}")
+    procesos = procesos or cpu_count()
+    reinicios = reinicios or procesos
+    procesos = min(procesos, reinicios)
+    rondas = math.ceil(reinicios / procesos)
+
+    rngSemillas = random.Random(semilla)
+    tareas = [(contextoMision, ancho, alto, presupuestoSegundos / rondas, rngSemillas.getrandbits(64), config)
+              for _ in range(reinicios)]
+    if procesos == 1:
+        resultados = [_recocidoSimulado(tarea) for tarea in tareas]
+    else:
+        with Pool(procesos) as pool:
+            resultados = pool.map(_recocidoSimulado, tareas, chunksize=1)
+
+    _, celdas, _ = max(resultados, key=lambda r: r[0])
+    layout = {'id': 'habitat_optimizado', 'cells': celdas}
+    scores = generarScoresHabitat(layout, contextoMision, config=config)
+    return {
+        'layout': layout,
+        'contexto': contextoMision,
+        'scores': scores,
+        'calificacionFinal': calcularCalificacionFinal(scores, config),
+        'iteraciones': sum(r[2] for r in resultados)
+    }
+
+
+# --- 4. EJEMPLO DE USO ---
+
+if __name__ == '__main__':
+    contexto = {"cantidadTripulacion": 4, "materialEstructural": "COMPUESTO", "resistenciaRadiacion": 7}
+    resultado = optimizarLayout(contexto, presupuestoSegundos=10)
+    print(f"Calificación final: {resultado['calificacionFinal']:.2f} "
+          f"({resultado['iteraciones']} movimientos evaluados)")
+
+    # Mismo formato que lee leerHabitatDesdeJsonTiles
+    with open("layout_optimizado.json", "w", encoding="utf-8") as f:
+        json.dump({"cells": resultado['layout']['cells'], "contexto": [contexto]}, f, indent=2, ensure_ascii=False)
+    print("Layout guardado en 'layout_optimizado.json'")
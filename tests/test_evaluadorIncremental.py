@@ -0,0 +1,45 @@
+import sys
+import random
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import funcionJSON
+
+CONTEXTO = {"cantidadTripulacion": 4, "materialEstructural": "COMPUESTO", "resistenciaRadiacion": 7}
+
+
+def _layoutCoordenadasFlotantes(semilla, numCeldas=30):
+    """Celdas con x/y no enteras (algunas con huella de 2x3) y una que comparte tile entero con la primera."""
+    rng = random.Random(semilla)
+    celdas = []
+    for _ in range(numCeldas):
+        celda = {"x": rng.uniform(0, 40), "y": rng.uniform(0, 40), "type": rng.choice(funcionJSON.TIPOS_MODULO),
+                 "props": {"masa": rng.uniform(1, 100), "volumen": 2.0, "costo": 0.0,
+                           "limpieza": rng.choice([0.0, 0.5, 1.0]), "permanencia": 1}}
+        if rng.random() < 0.3:
+            celda.update(w=2, h=3)
+        celdas.append(celda)
+    celdas.append(dict(celdas[0], x=celdas[0]['x'] + 0.5))
+    return celdas
+
+def _comparar(incremental, completo):
+    assert incremental.keys() == completo.keys()
+    for columna in funcionJSON.COLUMNAS_SCORES[1:]:
+        assert incremental[columna] == pytest.approx(completo[columna], abs=1e-9), columna
+
+
+@pytest.mark.parametrize('semilla', [0, 1, 2])
+def test_coordenadasFlotantesIgualAlScoringCompleto(semilla):
+    celdas = _layoutCoordenadasFlotantes(semilla)
+    evaluador = funcionJSON.EvaluadorIncremental(CONTEXTO, enumerate(celdas))
+    _comparar(evaluador.scores(), funcionJSON.generarScoresHabitat({'cells': celdas}, CONTEXTO))
+
+    # Quitar celdas debe liberar los tiles igual que si nunca hubieran estado
+    for clave in range(0, len(celdas), 3):
+        evaluador.quitarCelda(clave)
+    restantes = [c for clave, c in enumerate(celdas) if clave % 3]
+    _comparar(evaluador.scores(), funcionJSON.generarScoresHabitat({'cells': restantes}, CONTEXTO))
@@ -1,7 +1,9 @@
 from sklearn.linear_model import Lars
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import r2_score, mean_squared_error
+import os
 import pandas as pd
+import pyarrow.parquet as pq
 import joblib
 
 
@@ -11,9 +13,21 @@ def cargarModeloLars(path='modelo_lars.pkl'):
     """
     return joblib.load(path)
 
-# Cargar datos
-path = 'dataset_etiquetado.csv'
-df = pd.read_csv(path)
+def cargarDataset(pathParquet='dataset_etiquetado.parquet', pathCsv='dataset_etiquetado.csv'):
+    """
+    Carga el dataset etiquetado. Si existe la versión Parquet se lee mapeada en
+    memoria y sólo con las columnas de scores (sin celdas ni contexto); si no,
+    se usa el CSV.
+    """
+    if os.path.exists(pathParquet):
+        columnas = [c for c in pq.read_schema(pathParquet).names if c not in ('cells', 'contexto')]
+        return pd.read_parquet(pathParquet, columns=columnas, memory_map=True)
+    return pd.read_csv(pathCsv)
+
+# Cargar datos. dataset_etiquetado.csv (y el modelo_lars.pkl entrenado con él)
+# tiene scoreVistaEspacial calculado con modoVista='muestreado'; no mezclar con
+# filas etiquetadas con 'exacto' (ver dataLabeler.etiquetarDatos).
+df = cargarDataset()
 
 # Columnas a quitar de las features
 quitar_columnas = [
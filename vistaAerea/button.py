@@ -1,4 +1,5 @@
 import pygame
+from text_cache import render_text
 
 class ToggleButton:
     def __init__(self, x, y, width, height, options, font):
@@ -21,7 +22,7 @@ class ToggleButton:
     def draw(self, surface):
         color = self.hover_color if self.is_hovered else self.bg_color
         pygame.draw.rect(surface, color, self.rect)
-        text = self.font.render(self.options[self.current_index], True, self.text_color)
+        text = render_text(self.font, self.options[self.current_index], self.text_color)
         text_rect = text.get_rect(center=self.rect.center)
         surface.blit(text, text_rect)
 
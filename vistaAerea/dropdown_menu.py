@@ -1,4 +1,5 @@
 import pygame
+from text_cache import render_text
 
 class DropdownMenu:
     def __init__(self, x, y, width, height, options, font):
@@ -48,7 +49,7 @@ class DropdownMenu:
 
     def draw(self, surface):
         pygame.draw.rect(surface, self.bg_color, self.rect)
-        selected_text = self.font.render(self.options[self.selected_index], True, self.text_color)
+        selected_text = render_text(self.font, self.options[self.selected_index], self.text_color)
         surface.blit(selected_text, (self.rect.x + 5, self.rect.y + 5))
 
         if self.is_open:
@@ -64,7 +65,7 @@ class DropdownMenu:
                 mouse_x, mouse_y = pygame.mouse.get_pos()
                 if option_rect.collidepoint(mouse_x, mouse_y):
                     pygame.draw.rect(surface, self.highlight_color, option_rect)
-                option_text = self.font.render(self.options[option_index], True, self.text_color)
+                option_text = render_text(self.font, self.options[option_index], self.text_color)
                 surface.blit(option_text, (option_rect.x + 5, option_rect.y + 5))
 
     def get_selected_option(self):
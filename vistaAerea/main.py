@@ -5,13 +5,42 @@ import json
 from player import Player
 from world import WorldGeneration
 from topbar import TopBar
+from text_cache import render_text
 
 # Import scoring functions from funcionJSON.py
-from funcionJSON import leerHabitatDesdeJsonTiles, generarScoresHabitat, calcularCalificacionFinal
+from funcionJSON import leerHabitatDesdeJsonTiles, calcularCalificacionFinal, EvaluadorIncremental, CacheScores
 
 DARK_GRAY = (40, 40, 40)
 
-def main():
+MISSION_CONTEXT = {
+    "cantidadTripulacion": 1,
+    "materialEstructural": "compuesto",
+    "resistenciaRadiacion": 8
+}
+
+
+def block_to_cell(block):
+    return {
+        "x": block.gx,
+        "y": block.gy,
+        "w": block.width,
+        "h": block.height,
+        "type": block.type.upper(),
+        "props": {
+            "masa": getattr(block, "masa", 0.0),
+            "volumen": getattr(block, "volumen", 0.0),
+            "costo": getattr(block, "costo", 0.0),
+            "limpieza": getattr(block, "limpieza", 1.0),
+            "permanencia": getattr(block, "permanencia", 1)
+        }
+    }
+
+def main(dirty_rects=False):
+    """
+    Run the editor. With dirty_rects=True only the regions that changed this
+    frame (hover, placed/removed blocks, score, top bar) are redrawn and pushed
+    with pygame.display.update(rects); idle frames draw nothing.
+    """
     pygame.init()
     SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -37,6 +66,10 @@ def main():
 
     money = 200
     calificacionFinal = 0.0  # Initialize score
+    # Live score, updated incrementally on every placement/removal
+    evaluador = EvaluadorIncremental(MISSION_CONTEXT)
+    # Export scores, kept across sessions so re-exporting a layout is a lookup
+    score_cache = CacheScores(pathDisco="scores_cache.sqlite")
 
     placed_tiles_values = []  # Initialize list to store placed tile data
 
@@ -88,17 +121,65 @@ def main():
     def is_menu_open():
         return topbar.type_dropdown.is_open or topbar.toggle_button.is_open
 
+    topbar_rect = pygame.Rect(0, 0, SCREEN_WIDTH, topbar_height)
+
+    def ui_region():
+        return topbar_rect.unionall(get_ui_rects())
+
+    def block_screen_rect(block):
+        tile_size = world.tile_size
+        x_offset = (SCREEN_WIDTH - tile_size * world.grid_size) // 2
+        sx, sy = player.camera.transform_coordinate((block.gx * tile_size + x_offset,
+                                                     block.gy * tile_size + topbar_height))
+        return pygame.Rect(sx, sy, block.width * tile_size, block.height * tile_size)
+
+    def draw_scene(hover_rect, score_surfaces):
+        screen.fill(DARK_GRAY)
+        world.draw_grid(screen, player.camera, topbar_height)
+        world.draw_tiles(screen, player.camera, topbar_height)
+        player.draw(screen)
+
+        if hover_rect:
+            hover_surface = pygame.Surface(hover_rect.size, pygame.SRCALPHA)
+            hover_surface.fill((255, 255, 0, 100))
+            screen.blit(hover_surface, hover_rect.topleft)
+
+        # Draw top bar
+        topbar.draw(screen, money)
+
+        for surface, pos in score_surfaces:
+            screen.blit(surface, pos)
+
+    # Dirty-rect bookkeeping (only used when dirty_rects=True)
+    dirty = []
+    full_redraw = True
+    last_camera = None
+    last_hover_rect = None
+    last_score_rect = None
+    last_score_text = None
+    last_money = money
+
     running = True
     while running:
         mouse_grid_pos = None
         export_clicked = False
         import_clicked = False
+        dirty.clear()
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                score_cache.cerrar()
                 pygame.quit()
                 sys.exit()
+            if event.type == pygame.WINDOWEXPOSED:
+                full_redraw = True
+            ui_changes = event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL) or \
+                (event.type == pygame.MOUSEMOTION and is_menu_open())
+            if dirty_rects and ui_changes:
+                dirty.append(ui_region())
             topbar.handle_event(event)
+            if dirty_rects and ui_changes:
+                dirty.append(ui_region())
             if event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_pos = pygame.mouse.get_pos()
                 if topbar.export_button.rect.collidepoint(mouse_pos):
@@ -131,6 +212,8 @@ def main():
                                     placed = world.add_tile_block(grid_x, grid_y, width, height, selected_type, cost)
                                     if placed:
                                         money -= cost
+                                        evaluador.agregarCelda(placed, block_to_cell(placed))
+                                        dirty.append(block_screen_rect(placed))
                                     else:
                                         print("Tile placement failed: overlapping tiles")
                                 else:
@@ -139,35 +222,18 @@ def main():
                                 block = world.get_block_at(grid_x, grid_y)
                                 if block:
                                     world.remove_tile_at(grid_x, grid_y)
+                                    evaluador.quitarCelda(block)
+                                    dirty.append(block_screen_rect(block))
                                     money += cost_map.get((block.width, block.height), 5)
 
         if export_clicked:
             placed_tiles_values.clear()
             for block in world.tile_blocks:
-                cell = {
-                    "x": block.gx,
-                    "y": block.gy,
-                    "type": block.type.upper(),
-                    "props": {
-                        "masa": getattr(block, "masa", 0.0),
-                        "volumen": getattr(block, "volumen", 0.0),
-                        "costo": getattr(block, "costo", 0.0),
-                        "limpieza": getattr(block, "limpieza", 1.0),
-                        "permanencia": getattr(block, "permanencia", 1)
-                    }
-                }
-                placed_tiles_values.append(cell)
-
-            contexto = {
-                "contexto": {
-                    "cantidadTripulacion": 1,
-                    "materialEstructural": "compuesto",
-                    "resistenciaRadiacion": 8
-                }
-            }
+                placed_tiles_values.append(block_to_cell(block))
+
             data = {
                 "cells": placed_tiles_values,
-                "contexto": [contexto["contexto"]]
+                "contexto": [MISSION_CONTEXT]
             }
 
             with open("exported_tiles.json", "w") as f:
@@ -177,22 +243,20 @@ def main():
 
             # Calculate and update score from JSON data directly
             celdas, contexto_score = data["cells"], data["contexto"][0]
-            scores = generarScoresHabitat({'cells': celdas}, contexto_score)
+            scores = score_cache.generarScores({'cells': celdas}, contexto_score)
             calificacionFinal = calcularCalificacionFinal(scores)
             print(f"Calificación final (calculated on export): {calificacionFinal:.2f}")
 
         if import_clicked:
             try:
-                with open("imported_tiles.json", "r") as f:
-                    data = json.load(f)
-                world.tile_blocks.clear()
-                for cell in data.get("cells", []):
-                    gx = cell.get("x", 0)
-                    gy = cell.get("y", 0)
-                    tile_type = cell.get("type", "PRIVATE").lower()
-                    props = cell.get("props", {})
-                    width, height = 1, 1
-                    world.add_tile_block(gx, gy, width, height, tile_type, cost=0)
+                cells, _ = leerHabitatDesdeJsonTiles("imported_tiles.json", comoColeccion=True)
+                world.clear_tiles()
+                evaluador = EvaluadorIncremental(MISSION_CONTEXT)
+                for cell in cells:
+                    gx, gy = cell.x, cell.y
+                    tile_type = cell.tipo.lower()
+                    props = cell.props()
+                    world.add_tile_block(gx, gy, cell.w, cell.h, tile_type, cost=0)
                     block = world.get_block_at(gx, gy)
                     if block:
                         block.masa = props.get("masa", 0.0)
@@ -200,7 +264,10 @@ def main():
                         block.costo = props.get("costo", 0.0)
                         block.limpieza = props.get("limpieza", 1.0)
                         block.permanencia = props.get("permanencia", 1)
+                        if block not in evaluador:
+                            evaluador.agregarCelda(block, block_to_cell(block))
                 print("Imported tiles loaded from imported_tiles.json")
+                full_redraw = True
             except Exception as e:
                 print("Error importing tiles:", e)
 
@@ -221,27 +288,19 @@ def main():
             if 0 <= grid_x < world.grid_size and 0 <= grid_y < world.grid_size:
                 mouse_grid_pos = (grid_x, grid_y)
 
-        screen.fill(DARK_GRAY)
-        world.draw_grid(screen, player.camera, topbar_height)
-        world.draw_tiles(screen, player.camera, topbar_height)
-        player.draw(screen)
-
+        hover_rect = None
         if mouse_grid_pos:
             width, height = current_shape
             px = mouse_grid_pos[0] * world.tile_size
             py = mouse_grid_pos[1] * world.tile_size
             sx, sy = player.camera.transform_coordinate((px + x_offset, py + topbar_height))
             hover_rect = pygame.Rect(sx, sy, width * world.tile_size, height * world.tile_size)
-            hover_surface = pygame.Surface(hover_rect.size, pygame.SRCALPHA)
-            hover_surface.fill((255, 255, 0, 100))
-            screen.blit(hover_surface, hover_rect.topleft)
-
-        # Draw top bar
-        topbar.draw(screen, money)
 
         # Display score label and value on right side of grid
-        score_label = font.render("Score", True, (255, 255, 255))
-        score_number = font.render(f"{calificacionFinal:.2f}", True, (255, 255, 255))
+        calificacionFinal = evaluador.calificacion()
+        score_text = f"{calificacionFinal:.2f}"
+        score_label = render_text(font, "Score", (255, 255, 255))
+        score_number = render_text(font, score_text, (255, 255, 255))
         
         # Position at right side, below topbar padding
         label_x = SCREEN_WIDTH - score_label.get_width() - 10
@@ -249,11 +308,40 @@ def main():
         number_x = label_x
         number_y = label_y + score_label.get_height() + 2
         
-        screen.blit(score_label, (label_x, label_y))
-        screen.blit(score_number, (number_x, number_y))
+        score_surfaces = [(score_label, (label_x, label_y)), (score_number, (number_x, number_y))]
+
+        if not dirty_rects:
+            draw_scene(hover_rect, score_surfaces)
+            pygame.display.flip()
+        else:
+            score_rect = score_label.get_rect(topleft=(label_x, label_y)).union(
+                score_number.get_rect(topleft=(number_x, number_y)))
+            if (player.camera.x, player.camera.y) != last_camera:
+                full_redraw = True
+            if hover_rect != last_hover_rect:
+                dirty.extend(r for r in (last_hover_rect, hover_rect) if r)
+            if score_text != last_score_text:
+                dirty.extend(r for r in (last_score_rect, score_rect) if r)
+            if money != last_money:
+                dirty.append(topbar_rect)
+
+            if full_redraw:
+                draw_scene(hover_rect, score_surfaces)
+                pygame.display.flip()
+            elif dirty:
+                screen.set_clip(dirty[0].unionall(dirty[1:]))
+                draw_scene(hover_rect, score_surfaces)
+                screen.set_clip(None)
+                pygame.display.update(dirty)
+
+            full_redraw = False
+            last_camera = (player.camera.x, player.camera.y)
+            last_hover_rect = hover_rect
+            last_score_rect = score_rect
+            last_score_text = score_text
+            last_money = money
 
-        pygame.display.flip()
         clock.tick(60)
 
 if __name__ == "__main__":
-    main()
+    main(dirty_rects="--dirty-rects" in sys.argv)
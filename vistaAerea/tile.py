@@ -71,6 +71,26 @@ TYPE_PERMANENCIA = {
     "airlock": 0,
 }
 
+# Block surfaces shared by every block of the same (type, width, height,
+# tile_size): a layout with a thousand 4x4 private blocks keeps a single
+# pixel buffer for them.
+_block_surfaces = {}
+
+
+def block_surface(tile_type, width, height, tile_size):
+    """Shared surface for a width x height block of tile_type.
+
+    The returned surface is shared between blocks and must not be modified.
+    """
+    key = (tile_type, width, height, tile_size)
+    surface = _block_surfaces.get(key)
+    if surface is None:
+        surface = pygame.Surface((width * tile_size, height * tile_size))
+        surface.fill(TYPE_COLORS.get(tile_type, (255, 255, 255)))
+        _block_surfaces[key] = surface
+    return surface
+
+
 class TileBlock(pygame.sprite.Sprite):
     def __init__(self, gx, gy, width, height, tile_size, type_override=None, cost=0):
         super().__init__()
@@ -83,11 +103,7 @@ class TileBlock(pygame.sprite.Sprite):
         self.type = type_override if type_override else random.choice(TILE_TYPES)
         self.color = TYPE_COLORS.get(self.type, (255, 255, 255))  # default white
 
-        w_px = width * tile_size
-        h_px = height * tile_size
-        self.image = pygame.Surface((w_px, h_px))
-        self.image.fill(self.color)
-        self.rect = self.image.get_rect(topleft=(gx * tile_size, gy * tile_size))
+        self.rect = pygame.Rect(gx * tile_size, gy * tile_size, width * tile_size, height * tile_size)
 
         self.volumen = random.choice(TYPE_VOLUMES.get(self.type, [1.0]))  # volume chosen from type options
         self.costo = cost  # Assigned cost from block size
@@ -103,5 +119,9 @@ class TileBlock(pygame.sprite.Sprite):
             f"color = {self.color}"
         )
 
+    @property
+    def image(self):
+        return block_surface(self.type, self.width, self.height, self.tile_size)
+
     def covers(self, gx, gy):
         return (self.gx <= gx < self.gx + self.width) and (self.gy <= gy < self.gy + self.height)
@@ -1,4 +1,5 @@
 import pygame
+from text_cache import render_text
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -60,7 +61,7 @@ class ToggleButton:
     def draw(self, surface):
         pygame.draw.rect(surface, self.bg_color, self.rect)
         text = self.get_current_option() or ""
-        text_surface = self.font.render(text, True, self.text_color)
+        text_surface = render_text(self.font, text, self.text_color)
         surface.blit(text_surface, (self.rect.x + 5, self.rect.y + (self.rect.height - text_surface.get_height()) // 2))
 
         if len(self.options) > 2:
@@ -76,7 +77,7 @@ class ToggleButton:
                         self.rect.width,
                         self.rect.height)
                     pygame.draw.rect(surface, self.bg_color, option_rect)
-                    option_text = self.font.render(option, True, self.text_color)
+                    option_text = render_text(self.font, option, self.text_color)
                     surface.blit(option_text, (option_rect.x + 5, option_rect.y + (option_rect.height - option_text.get_height()) // 2))
                     if option_rect.collidepoint(pygame.mouse.get_pos()):
                         pygame.draw.rect(surface, self.highlight_color, option_rect, 2)
@@ -163,7 +164,7 @@ class TopBar:
         self.export_button.draw(surface)
         self.import_button.draw(surface)
 
-        money_text = self.font.render(f"Money: ${money}", True, (255, 255, 255))
+        money_text = render_text(self.font, f"Money: ${money}", (255, 255, 255))
         text_rect = money_text.get_rect()
         center_x = surface.get_width() // 2
         center_y = self.height // 2
@@ -2,6 +2,7 @@ import pygame
 from tile import TileBlock
 
 GRAY = (180, 180, 180)
+GRID_COLORKEY = (0, 0, 0)
 
 class WorldGeneration:
     def __init__(self, screen_width=800, screen_height=600, topbar_height=40, grid_size=25):
@@ -15,62 +16,87 @@ class WorldGeneration:
         tile_size_horz = self._screen_width / self.grid_size
         self._tile_size = int(min(tile_size_vert, tile_size_horz))
 
-        self.tile_blocks = []
+        # Blocks in placement order, plus a spatial hash from each covered
+        # tile to its block so lookups/overlap tests don't scan every block.
+        self._blocks = {}
+        self._occupancy = {}
+
+        self._grid_layer_surface = None
+        self._grid_layer_key = None
+
+    @staticmethod
+    def _footprint(gx, gy, width, height):
+        return [(x, y) for x in range(gx, gx + width) for y in range(gy, gy + height)]
 
     def check_overlap(self, gx, gy, width, height):
-        for block in self.tile_blocks:
-            if (gx + width <= block.gx or gx >= block.gx + block.width or
-                gy + height <= block.gy or gy >= block.gy + block.height):
-                continue
-            else:
-                return True
-        return False
+        return any(cell in self._occupancy for cell in self._footprint(gx, gy, width, height))
 
     def add_tile_block(self, gx, gy, width, height, type_override=None, cost=0):
         if self.check_overlap(gx, gy, width, height):
             print("Cannot place block: Overlaps existing block")
             return False
         block = TileBlock(gx, gy, width, height, self._tile_size, type_override, cost)
-        self.tile_blocks.append(block)
-        return True
+        self._blocks[block] = None
+        for cell in self._footprint(gx, gy, width, height):
+            self._occupancy[cell] = block
+        return block
 
     def remove_tile_at(self, gx, gy):
-        for block in self.tile_blocks:
-            if block.covers(gx, gy):
-                self.tile_blocks.remove(block)
-                break
+        block = self._occupancy.get((gx, gy))
+        if block is None:
+            return None
+        for cell in self._footprint(block.gx, block.gy, block.width, block.height):
+            del self._occupancy[cell]
+        del self._blocks[block]
+        return block
 
     def get_block_at(self, gx, gy):
-        for block in self.tile_blocks:
-            if block.covers(gx, gy):
-                return block
-        return None
+        return self._occupancy.get((gx, gy))
+
+    def clear_tiles(self):
+        self._blocks.clear()
+        self._occupancy.clear()
+
+    def _grid_layer(self):
+        """Grid lines pre-rendered once; rebuilt only when tile or grid size changes."""
+        key = (self._tile_size, self.grid_size)
+        if self._grid_layer_key != key:
+            tile_size = self._tile_size
+            size = tile_size * self.grid_size
+            layer = pygame.Surface((size, size))
+            layer.fill(GRID_COLORKEY)
+            layer.set_colorkey(GRID_COLORKEY)
+            for gx in range(self.grid_size):
+                for gy in range(self.grid_size):
+                    rect = pygame.Rect(gx * tile_size, gy * tile_size, tile_size, tile_size)
+                    pygame.draw.rect(layer, GRAY, rect, 1)
+            self._grid_layer_surface = layer
+            self._grid_layer_key = key
+        return self._grid_layer_surface
 
     def draw_grid(self, surface, camera, topbar_height):
         tile_size = self._tile_size
         grid_pixel_width = tile_size * self.grid_size
         x_offset = (self._screen_width - grid_pixel_width) // 2  # Center horizontally
 
-        for gx in range(self.grid_size):
-            for gy in range(self.grid_size):
-                wx = gx * tile_size + x_offset
-                wy = gy * tile_size + topbar_height
-                sx, sy = camera.transform_coordinate((wx, wy))
-                rect = pygame.Rect(sx, sy, tile_size, tile_size)
-                pygame.draw.rect(surface, GRAY, rect, 1)
+        surface.blit(self._grid_layer(), camera.transform_coordinate((x_offset, topbar_height)))
 
     def draw_tiles(self, surface, camera, topbar_height):
         tile_size = self._tile_size
         grid_pixel_width = tile_size * self.grid_size
         x_offset = (self._screen_width - grid_pixel_width) // 2  # Center horizontally
 
-        for block in self.tile_blocks:
+        for block in self._blocks:
             wx = block.gx * tile_size + x_offset
             wy = block.gy * tile_size + topbar_height
             sx, sy = camera.transform_coordinate((wx, wy))
             block.rect.topleft = (sx, sy)
             surface.blit(block.image, block.rect)
 
+    @property
+    def tile_blocks(self):
+        return list(self._blocks)
+
     @property
     def tile_size(self):
         return self._tile_size